@@ -1,24 +1,55 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from app.replicas import RoutingSession, pool_stats
 
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
-def create_app():
+def init_migrations(app):
+    # Flask-Migrate pulls in Alembic, which only the `flask db` commands need,
+    # so it is registered when the app is loaded by the flask CLI and not in
+    # web workers.
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+def create_app(config=None):
     app = Flask(__name__)
     app.config.from_object('app.config.Config')
+    if config:
+        app.config.update(config)
     
+    # The factory never connects to the database; create the schema with
+    # `flask init-db` (or Flask-Migrate) before starting the workers.
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_migrations(app)
     jwt.init_app(app)
     
     with app.app_context():
-        from .auth import routes
+        from .instrumentation import request_metrics
+        request_metrics.init_app(app)
+        from .auth.routes import auth_bp
+        app.register_blueprint(auth_bp)
+        from .auth.identity import identity_cache
+        identity_cache.init_app(app)
+        from .auth.passwords import password_hasher
+        password_hasher.init_app(app)
+        from .recipe.cache import recipe_cache
+        recipe_cache.init_app(app)
+        request_metrics.register_collector('recipe_cache', recipe_cache.stats)
+        request_metrics.register_collector('identity_cache', identity_cache.stats)
+        request_metrics.register_collector('db_pool', pool_stats)
+        from .recipe.coalescing import read_coalescer
+        read_coalescer.init_app(app)
+        request_metrics.register_collector('recipe_coalescing', read_coalescer.stats)
+        from .recipe.suggest import suggest_index
+        suggest_index.init_app(app)
+        request_metrics.register_collector('suggest', suggest_index.stats)
         from .recipe.blueprint import recipe_bp
         app.register_blueprint(recipe_bp)
-        db.create_all()
+        from .commands import init_db_command
+        app.cli.add_command(init_db_command)
     
     return app
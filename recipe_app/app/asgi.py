@@ -0,0 +1,95 @@
+from contextlib import asynccontextmanager
+import anyio
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.routing import Route
+from app import create_app
+from app.auth.async_routes import register, login
+from app.recipe.async_routes import RecipesEndpoint, RecipeEndpoint
+from app.recipe.suggest import suggest_index
+
+# Endpoints without an async view, handed to the Flask app through a WSGI
+# bridge. They are routed ahead of /recipes/{title}, which would match them.
+FLASK_ROUTES = ('/metrics', '/recipes/stats', '/recipes/suggest', '/recipes/export', '/recipes/batch', '/recipes/import')
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+class FlaskContextMiddleware:
+    # Every request runs inside an app context of the Flask app, so config,
+    # logging, Flask-JWT-Extended and the shared query helpers work unchanged.
+    # The context stays in the request's task across awaits.
+
+    def __init__(self, app, flask_app):
+        self.app = app
+        self.flask_app = flask_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        with self.flask_app.app_context():
+            await self.app(scope, receive, send)
+
+
+class WriteThreads:
+    # Writes reuse the Flask write path (catalog links, search index, stats and
+    # caches) with a sync session, on at most ASYNC_WRITE_THREADS threads.
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.limiter = None
+
+    async def run(self, operation, *args):
+        def call():
+            with self.flask_app.app_context():
+                return operation(*args)
+
+        if self.limiter is None:
+            # Created on first use, inside the running event loop
+            self.limiter = anyio.CapacityLimiter(self.flask_app.config['ASYNC_WRITE_THREADS'])
+        return await anyio.to_thread.run_sync(call, limiter=self.limiter)
+
+
+def create_asgi_app(config=None):
+    # The Flask app supplies configuration, extensions and the write path;
+    # reads, /register and /login are served on an async engine, and the
+    # FLASK_ROUTES by the Flask app itself.
+    flask_app = create_app(config)
+    flask_routes = WSGIMiddleware(flask_app)
+    engine = create_async_engine(
+        async_database_url(flask_app.config['ASYNC_DATABASE_URI'] or flask_app.config['SQLALCHEMY_DATABASE_URI']),
+        **flask_app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        suggest_index.refresh_in_background(flask_app)
+        yield
+        await engine.dispose()
+
+    app = Starlette(
+        routes=[Route(path, flask_routes) for path in FLASK_ROUTES] + [
+            Route('/register', register, methods=['POST']),
+            Route('/login', login, methods=['POST']),
+            Route('/recipes', RecipesEndpoint),
+            Route('/recipes/{title}', RecipeEndpoint),
+        ],
+        middleware=[Middleware(FlaskContextMiddleware, flask_app=flask_app)],
+        lifespan=lifespan,
+    )
+    app.state.flask_app = flask_app
+    app.state.engine = engine
+    app.state.sessions = async_sessionmaker(engine, expire_on_commit=False)
+    app.state.run_write = WriteThreads(flask_app).run
+    return app
@@ -0,0 +1,86 @@
+from flask import current_app as app
+from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import select
+from starlette.responses import JSONResponse
+from .identity import identity_cache, token_identity
+from .models import User
+from .passwords import password_hasher, HasherBusy
+
+# /register and /login for the ASGI app, plus the bearer token check its write
+# views use. Tokens are issued and decoded by Flask-JWT-Extended with the same
+# configuration, so either app accepts tokens issued by the other.
+
+
+class Unauthorized(Exception):
+    def __init__(self, message, status_code=401):
+        super().__init__(message)
+        self.response = JSONResponse({'msg': message}, status_code=status_code)
+
+
+async def request_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def authenticate(request, session):
+    header = request.headers.get('Authorization')
+    if not header:
+        raise Unauthorized('Missing Authorization Header')
+    scheme, _, token = header.partition(' ')
+    if scheme != 'Bearer' or not token:
+        raise Unauthorized("Bad Authorization header. Expected 'Authorization: Bearer <JWT>'", 422)
+
+    try:
+        claims = decode_token(token)
+    except ExpiredSignatureError:
+        raise Unauthorized('Token has expired')
+    except (InvalidTokenError, JWTExtendedException) as e:
+        raise Unauthorized(str(e), 422)
+    if claims.get('type') != 'access':
+        raise Unauthorized('Only non-refresh tokens are allowed', 422)
+
+    identity = await identity_cache.resolve_async(claims[app.config['JWT_IDENTITY_CLAIM']], session)
+    if identity is None:
+        raise Unauthorized('Unknown user')
+    return identity
+
+
+async def register(request):
+    data = await request_json(request)
+    if not isinstance(data, dict):
+        return JSONResponse({'message': 'Invalid JSON'}, status_code=400)
+    try:
+        hashed_password = await password_hasher.hash_async(data['password'])
+    except HasherBusy:
+        return JSONResponse({'message': 'Too many concurrent requests, try again later'}, status_code=503)
+
+    async with request.app.state.sessions() as session:
+        session.add(User(username=data['username'], password=hashed_password))
+        await session.commit()
+    return JSONResponse({'message': 'User registered successfully'}, status_code=201)
+
+
+async def login(request):
+    data = await request_json(request)
+    if not isinstance(data, dict):
+        return JSONResponse({'message': 'Invalid JSON'}, status_code=400)
+
+    async with request.app.state.sessions() as session:
+        user = (await session.scalars(select(User).filter_by(username=data['username']).limit(1))).first()
+        try:
+            if user and await password_hasher.verify_async(data['password'], user.password):
+                if password_hasher.needs_rehash(user.password):
+                    try:
+                        user.password = await password_hasher.hash_async(data['password'])
+                        await session.commit()
+                    except HasherBusy:
+                        pass  # Upgraded on a later login
+                access_token = create_access_token(identity=token_identity(user))
+                return JSONResponse({'access_token': access_token}, status_code=200)
+        except HasherBusy:
+            return JSONResponse({'message': 'Too many concurrent requests, try again later'}, status_code=503)
+    return JSONResponse({'message': 'Invalid credentials'}, status_code=401)
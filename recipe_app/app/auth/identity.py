@@ -0,0 +1,94 @@
+from collections import namedtuple
+from functools import wraps
+from flask import g, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import event, inspect, select
+from werkzeug.local import LocalProxy
+from app import db
+from app.cache import LRUCache
+from .models import User
+
+Identity = namedtuple('Identity', 'id username')
+
+
+class IdentityCache:
+    # Resolves token identities to (id, username) without a User query on every
+    # request. Entries expire after IDENTITY_CACHE_TTL seconds and are dropped
+    # in-process as soon as a user is renamed or deleted.
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        self.backend = LRUCache(
+            max_entries=app.config['IDENTITY_CACHE_MAX_ENTRIES'],
+            default_ttl=app.config['IDENTITY_CACHE_TTL']
+        )
+        app.extensions['identity_cache'] = self
+
+    def resolve(self, claims):
+        identity = self.backend.get(f'user:{claims["username"]}')
+        if identity is None:
+            row = db.session.query(User.id, User.username).filter_by(username=claims['username']).first()
+            if row is None:
+                return None
+            identity = self.remember(row)
+        return self.matching(claims, identity)
+
+    async def resolve_async(self, claims, session):
+        # Same as resolve() for the ASGI app, querying through an AsyncSession
+        identity = self.backend.get(f'user:{claims["username"]}')
+        if identity is None:
+            row = (await session.execute(
+                select(User.id, User.username).filter_by(username=claims['username'])
+            )).first()
+            if row is None:
+                return None
+            identity = self.remember(row)
+        return self.matching(claims, identity)
+
+    def remember(self, row):
+        identity = Identity(row.id, row.username)
+        self.backend.set(f'user:{row.username}', identity)
+        return identity
+
+    def matching(self, claims, identity):
+        # Tokens issued before the id claim existed only carry the username
+        if claims.get('id', identity.id) != identity.id:
+            return None
+        return identity
+
+    def stats(self):
+        return self.backend.stats() if self.backend is not None else {}
+
+    def invalidate(self, *usernames):
+        if self.backend is not None:
+            self.backend.delete(*(f'user:{username}' for username in usernames))
+
+
+identity_cache = IdentityCache()
+
+
+def token_identity(user):
+    return {'id': user.id, 'username': user.username}
+
+
+current_identity = LocalProxy(lambda: g.identity)
+
+
+def identity_required(view):
+    @jwt_required()
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.identity = identity_cache.resolve(get_jwt_identity())
+        if g.identity is None:
+            return jsonify({'message': 'Unknown user'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_user(mapper, connection, user):
+    history = inspect(user).attrs.username.history
+    identity_cache.invalidate(user.username, *(history.deleted or ()))
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import bcrypt
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    # Runs bcrypt on a small dedicated pool. bcrypt releases the GIL, so a
+    # burst of logins can use at most BCRYPT_WORKERS cores and leaves the rest
+    # to request threads; callers beyond BCRYPT_MAX_PENDING get HasherBusy
+    # instead of queueing behind the burst.
+
+    def __init__(self):
+        self.executor = None
+
+    def init_app(self, app):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        workers = app.config['BCRYPT_WORKERS']
+        self.rounds = app.config['BCRYPT_ROUNDS']
+        self.timeout = app.config['BCRYPT_TIMEOUT']
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.slots = threading.BoundedSemaphore(workers + app.config['BCRYPT_MAX_PENDING'])
+        app.extensions['password_hasher'] = self
+
+    def _submit(self, fn, args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self.executor.submit(self._call, fn, args)
+        except RuntimeError:
+            self.slots.release()
+            raise
+
+    def _run(self, fn, *args):
+        future = self._submit(fn, args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy()
+
+    async def _run_async(self, fn, *args):
+        # Same pool and limits, awaited instead of blocking the event loop
+        future = asyncio.wrap_future(self._submit(fn, args))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise HasherBusy()
+
+    def _call(self, fn, args):
+        try:
+            return fn(*args)
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        hashed = self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, password, hashed):
+        try:
+            return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+    async def hash_async(self, password):
+        hashed = await self._run_async(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    async def verify_async(self, password, hashed):
+        try:
+            return await self._run_async(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            return False
+
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher()
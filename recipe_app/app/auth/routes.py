@@ -1,23 +1,38 @@
-from flask import request, jsonify, current_app as app
+from flask import Blueprint, request, jsonify
 from app import db
+from .identity import token_identity
 from .models import User
+from .passwords import password_hasher, HasherBusy
 from flask_jwt_extended import create_access_token
-import bcrypt
 
-@app.route('/register', methods=['POST'])
+auth_bp = Blueprint('auth', __name__)
+
+@auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
-    hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
-    new_user = User(username=data['username'], password=hashed_password.decode('utf-8'))
+    try:
+        hashed_password = password_hasher.hash(data['password'])
+    except HasherBusy:
+        return jsonify({'message': 'Too many concurrent requests, try again later'}), 503
+    new_user = User(username=data['username'], password=hashed_password)
     db.session.add(new_user)
     db.session.commit()
     return jsonify({'message': 'User registered successfully'}), 201
 
-@app.route('/login', methods=['POST'])
+@auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
     user = User.query.filter_by(username=data['username']).first()
-    if user and bcrypt.checkpw(data['password'].encode('utf-8'), user.password.encode('utf-8')):
-        access_token = create_access_token(identity={'username': user.username})
-        return jsonify(access_token=access_token), 200
+    try:
+        if user and password_hasher.verify(data['password'], user.password):
+            if password_hasher.needs_rehash(user.password):
+                try:
+                    user.password = password_hasher.hash(data['password'])
+                    db.session.commit()
+                except HasherBusy:
+                    pass  # Upgraded on a later login
+            access_token = create_access_token(identity=token_identity(user))
+            return jsonify(access_token=access_token), 200
+    except HasherBusy:
+        return jsonify({'message': 'Too many concurrent requests, try again later'}), 503
     return jsonify({'message': 'Invalid credentials'}), 401
@@ -0,0 +1,67 @@
+import time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateColumn
+from app import db
+
+
+def add_column(connection, table, column):
+    preparer = connection.dialect.identifier_preparer
+    statement = f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN '
+    default = column.server_default.arg if column.server_default is not None else None
+    if connection.dialect.name == 'sqlite' and default is not None and not isinstance(default, str):
+        # SQLite only adds columns with a constant default; fill them once instead
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(f'{statement}{preparer.format_column(column)} {column_type}'))
+        connection.execute(update(table).values({column.name: default}))
+    else:
+        connection.execute(text(statement + str(CreateColumn(column).compile(dialect=connection.dialect))))
+    for index in table.indexes:
+        if column.name in index.columns:
+            index.create(connection, checkfirst=True)
+
+
+def add_missing_columns(connection):
+    # create_all() skips tables that exist, so columns added to a model since
+    # its table was created are added here. They need a server default (or
+    # to be nullable) for the rows already stored.
+    inspector = inspect(connection)
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise click.ClickException(f'Cannot add {table.name}.{column.name} to existing rows: it has no server default')
+            add_column(connection, table, column)
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+
+@click.command('init-db')
+@click.option('--drop', is_flag=True, help='Drop all tables first.')
+@click.option('--wait', type=float, default=0, help='Seconds to keep retrying while the database is not reachable yet.')
+@with_appcontext
+def init_db_command(drop, wait):
+    """Create the tables, search index and other schema objects that do not exist yet."""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            if drop:
+                db.drop_all()
+            with db.engine.begin() as connection:
+                added = add_missing_columns(connection)
+            db.create_all()
+            break
+        except OperationalError as e:
+            if time.monotonic() >= deadline:
+                raise click.ClickException(f'Database not reachable: {e.orig}')
+            time.sleep(1)
+    for column in added:
+        click.echo(f'Added column {column}')
+    click.echo('Initialized the database')
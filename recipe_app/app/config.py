@@ -1,9 +1,53 @@
 from datetime import timedelta
 import os
 
+def engine_options():
+    options = {
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    }
+    # Left to SQLAlchemy's defaults unless set; SQLite memory databases reject them
+    for option, variable in (('pool_size', 'DB_POOL_SIZE'), ('max_overflow', 'DB_MAX_OVERFLOW'), ('pool_timeout', 'DB_POOL_TIMEOUT')):
+        if os.getenv(variable):
+            options[option] = int(os.getenv(variable))
+    return options
+
+def replica_binds():
+    urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    return {f'replica{number}': dict(engine_options(), url=url) for number, url in enumerate(urls)}
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'mysecret')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'postgresql://postgres:password@db:5432/recipes_db')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options()
+    SQLALCHEMY_BINDS = replica_binds()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'myjwtsecret')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
+    SEARCH_TEXT_CONFIG = os.getenv('SEARCH_TEXT_CONFIG', 'simple')
+    RECIPE_CACHE_ENABLED = os.getenv('RECIPE_CACHE_ENABLED', 'true').lower() == 'true'
+    RECIPE_CACHE_MAX_ENTRIES = int(os.getenv('RECIPE_CACHE_MAX_ENTRIES', 1024))
+    RECIPE_CACHE_TTL = int(os.getenv('RECIPE_CACHE_TTL', 60))
+    RECIPE_COALESCE_ENABLED = os.getenv('RECIPE_COALESCE_ENABLED', 'true').lower() == 'true'
+    RECIPE_COALESCE_TIMEOUT = float(os.getenv('RECIPE_COALESCE_TIMEOUT', 5))
+    RECIPE_IMPORT_BATCH_SIZE = int(os.getenv('RECIPE_IMPORT_BATCH_SIZE', 1000))
+    RECIPE_IMPORT_MAX_ELEMENT_SIZE = int(os.getenv('RECIPE_IMPORT_MAX_ELEMENT_SIZE', 1024 * 1024))
+    RECIPE_EXPORT_CHUNK_SIZE = int(os.getenv('RECIPE_EXPORT_CHUNK_SIZE', 1000))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 300))
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', 2))
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 32))
+    BCRYPT_TIMEOUT = float(os.getenv('BCRYPT_TIMEOUT', 5))
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 0))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+    SUGGEST_LIMIT = int(os.getenv('SUGGEST_LIMIT', 10))
+    SUGGEST_MAX_LIMIT = int(os.getenv('SUGGEST_MAX_LIMIT', 50))
+    SUGGEST_REFRESH_SECONDS = int(os.getenv('SUGGEST_REFRESH_SECONDS', 300))
+    STATS_TOP_LIMIT = int(os.getenv('STATS_TOP_LIMIT', 10))
+    STATS_MAX_LIMIT = int(os.getenv('STATS_MAX_LIMIT', 100))
+    BATCH_MAX_OPERATIONS = int(os.getenv('BATCH_MAX_OPERATIONS', 100))
+    ASYNC_DATABASE_URI = os.getenv('ASYNC_DATABASE_URL')
+    ASYNC_WRITE_THREADS = int(os.getenv('ASYNC_WRITE_THREADS', 8))
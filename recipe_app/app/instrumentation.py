@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from flask import g, request, current_app, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class RequestMetrics:
+    # Per-request SQL count and time (via engine events), handler and
+    # serialization time and response size. Reported per request in a
+    # Server-Timing header and aggregated per endpoint for /metrics.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.collectors = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.durations = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.db_durations = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.response_sizes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+            self.requests = Counter()
+            self.statements = Counter()
+            self.n_plus_one = Counter()
+
+    def init_app(self, app):
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        if app.config['METRICS_ENABLED']:
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        app.extensions['request_metrics'] = self
+
+    def register_collector(self, name, collect):
+        # collect() returns a flat dict of numbers exported as gauges
+        self.collectors[name] = collect
+
+    def start_request(self):
+        g.request_started = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_statements = Counter()
+        g.timings = defaultdict(float)
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if has_request_context() and 'timings' in g:
+                g.timings[name] += time.perf_counter() - started
+
+    def record_statement(self, statement, elapsed):
+        g.sql_count += 1
+        g.sql_time += elapsed
+        g.sql_statements[statement] += 1
+
+    def finish_request(self, response):
+        if 'request_started' not in g:
+            return response
+
+        handler_time = time.perf_counter() - g.request_started
+        endpoint = request.endpoint or 'unmatched'
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        if current_app.config['SERVER_TIMING_ENABLED']:
+            parts = [
+                f'handler;dur={handler_time * 1000:.2f}',
+                f'db;dur={g.sql_time * 1000:.2f};desc="{g.sql_count} queries"',
+            ]
+            parts += [f'{name};dur={value * 1000:.2f}' for name, value in g.timings.items()]
+            response.headers['Server-Timing'] = ', '.join(parts)
+
+        repeated = [(statement, count) for statement, count in g.sql_statements.items() if count >= current_app.config['N_PLUS_ONE_THRESHOLD']]
+        for statement, count in repeated:
+            current_app.logger.warning(f"Possible N+1 in {endpoint}: {count} identical statements: {statement}")
+
+        with self._lock:
+            labels = (('endpoint', endpoint), ('method', request.method))
+            self.durations[labels].observe(handler_time)
+            self.db_durations[labels].observe(g.sql_time)
+            self.statements[labels] += g.sql_count
+            self.requests[labels + (('status', response.status_code),)] += 1
+            if size is not None:
+                self.response_sizes[labels].observe(size)
+            if repeated:
+                self.n_plus_one[labels] += 1
+        return response
+
+    def metrics_view(self):
+        return current_app.response_class(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def render(self):
+        lines = []
+        with self._lock:
+            self._render_histograms(lines, 'recipe_api_request_duration_seconds', 'Time spent handling requests.', self.durations)
+            self._render_histograms(lines, 'recipe_api_request_db_seconds', 'Time spent in SQL per request.', self.db_durations)
+            self._render_histograms(lines, 'recipe_api_response_size_bytes', 'Response body size.', self.response_sizes)
+            self._render_counter(lines, 'recipe_api_requests_total', 'Requests handled.', self.requests)
+            self._render_counter(lines, 'recipe_api_db_statements_total', 'SQL statements executed by requests.', self.statements)
+            self._render_counter(lines, 'recipe_api_n_plus_one_requests_total', 'Requests that repeated an identical statement.', self.n_plus_one)
+
+        for name, collect in sorted(self.collectors.items()):
+            for key, value in sorted(collect().items()):
+                if isinstance(value, (int, float)):
+                    lines.append(f'# TYPE recipe_api_{name}_{key} gauge')
+                    lines.append(f'recipe_api_{name}_{key} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_histograms(self, lines, name, help_text, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+            lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum}')
+            lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+
+    def _render_counter(self, lines, name, help_text, counter):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for labels, value in sorted(counter.items()):
+            lines.append(f'{name}{format_labels(labels)} {value}')
+
+
+request_metrics = RequestMetrics()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def finish_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['statement_started'].pop()
+    if not has_app_context():
+        return
+
+    if has_request_context() and 'sql_statements' in g:
+        request_metrics.record_statement(statement, elapsed)
+
+    slow_query_ms = current_app.config['SLOW_QUERY_MS']
+    if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+        params = repr(parameters)
+        if len(params) > 1000:
+            params = params[:1000] + '...'
+        current_app.logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement} parameters={params}")
+
+
+@event.listens_for(Engine, 'handle_error')
+def discard_statement(context):
+    if context.execution_context is not None and context.connection is not None:
+        started = context.connection.info.get('statement_started')
+        if started:
+            started.pop()
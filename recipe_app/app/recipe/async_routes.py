@@ -0,0 +1,173 @@
+from flask import current_app as app
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.endpoints import HTTPEndpoint
+from starlette.responses import JSONResponse, Response
+from werkzeug.http import http_date, parse_date, parse_etags, quote_etag
+from app.auth.async_routes import Unauthorized, authenticate, request_json
+from app.recipe import operations
+from app.recipe.catalog import ingredient_filter
+from app.recipe.etags import recipe_etag, catalog_etag
+from app.recipe.model_repos.async_recipe_repo import AsyncRecipeRepository
+from app.recipe.pagination import InvalidCursor
+from app.recipe.serializers import RECIPE_FIELDS, InvalidFields, dumps, parse_fields, serializer_for
+
+# The /recipes views for the ASGI app: reads run on the request's AsyncSession
+# through AsyncRecipeRepository, writes run the same operations as the Flask
+# views on a bounded thread pool (request.app.state.run_write).
+
+
+def json_response(payload, status_code=200):
+    return Response(dumps(payload), status_code=status_code, media_type='application/json')
+
+
+def arg(request, name, default, type=str):
+    # request.args.get(name, default, type=...) semantics
+    try:
+        return type(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def is_not_modified(request, etag, last_modified=None):
+    if 'if-none-match' in request.headers:
+        return parse_etags(request.headers['if-none-match']).contains(etag)
+    since = parse_date(request.headers.get('if-modified-since'))
+    if last_modified is not None and since is not None:
+        return last_modified.replace(microsecond=0, tzinfo=since.tzinfo) <= since
+    return False
+
+
+def with_validators(response, etag, last_modified=None):
+    response.headers['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified.replace(microsecond=0))
+    return response
+
+
+class BaseRecipeEndpoint(HTTPEndpoint):
+
+    def read_args(self, request):
+        self.fields = parse_fields(request.query_params.get('fields'))
+        self.ingredients = ingredient_filter(request.query_params.get('with'), request.query_params.get('without'))
+
+    def sparse_fields(self):
+        return self.fields if self.fields != RECIPE_FIELDS else None
+
+    async def write(self, request, operation, *args, with_body=True):
+        async with request.app.state.sessions() as session:
+            try:
+                identity = await authenticate(request, session)
+            except Unauthorized as e:
+                return e.response
+        if with_body:
+            data = await request_json(request)
+            if data is None:
+                return JSONResponse({'message': 'Invalid JSON'}, status_code=400)
+            args = args + (data,)
+        payload, status_code = await request.app.state.run_write(operation, *args, identity)
+        return json_response(payload, status_code)
+
+
+class RecipesEndpoint(BaseRecipeEndpoint):
+
+    async def get(self, request):
+        try:
+            self.read_args(request)
+        except InvalidFields as e:
+            return JSONResponse({'message': str(e)}, status_code=400)
+
+        page = arg(request, 'page', 1, int)
+        per_page = arg(request, 'per_page', 10, int)
+        search_query = arg(request, 'search', '')
+        cursor = request.query_params.get('cursor')
+        total = request.query_params.get('total')
+
+        async with request.app.state.sessions() as session:
+            try:
+                etag = catalog_etag(
+                    await AsyncRecipeRepository.get_catalog_version(session),
+                    page=page, per_page=per_page, search=search_query, cursor=cursor, total=total,
+                    fields=','.join(self.fields),
+                    **{
+                        'with': ','.join(self.ingredients.include) if self.ingredients else '',
+                        'without': ','.join(self.ingredients.exclude) if self.ingredients else ''
+                    }
+                )
+                if is_not_modified(request, etag):
+                    return with_validators(Response(status_code=304), etag)
+
+                if cursor is not None:
+                    response = await self.get_recipes_by_cursor(session, cursor, per_page, search_query, total)
+                else:
+                    response = await self.get_all_recipes(session, page, per_page, search_query)
+            except SQLAlchemyError as e:
+                app.logger.error(f"Error fetching recipes: {str(e)}")
+                return JSONResponse({'message': 'An error occurred while fetching the recipes'}, status_code=500)
+
+        if response.status_code == 200:
+            with_validators(response, etag)
+        return response
+
+    async def get_all_recipes(self, session, page, per_page, search_query):
+        recipes_page = await AsyncRecipeRepository.get_recipes(session, page, per_page, search_query, self.fields, self.ingredients)
+        meta = {
+            'page': recipes_page.page,
+            'pages': recipes_page.pages,
+            'per_page': recipes_page.per_page,
+            'total': recipes_page.total
+        }
+        return json_response({'meta': meta, 'recipes': serializer_for(self.fields).many(recipes_page.items)})
+
+    async def get_recipes_by_cursor(self, session, cursor, per_page, search_query, total):
+        try:
+            recipes_page = await AsyncRecipeRepository.get_recipes_after(
+                session, cursor, per_page, search_query, total, self.fields, self.ingredients
+            )
+        except InvalidCursor:
+            return JSONResponse({'message': 'Invalid cursor'}, status_code=400)
+
+        meta = {'per_page': recipes_page.per_page, 'next_cursor': recipes_page.next_cursor}
+        if recipes_page.total is not None:
+            meta['total'] = recipes_page.total
+        return json_response({'meta': meta, 'recipes': serializer_for(self.fields).many(recipes_page.items)})
+
+    async def post(self, request):
+        return await self.write(request, operations.create_recipe)
+
+
+class RecipeEndpoint(BaseRecipeEndpoint):
+
+    async def get(self, request):
+        title = request.path_params['title']
+        try:
+            self.read_args(request)
+        except InvalidFields as e:
+            return JSONResponse({'message': str(e)}, status_code=400)
+
+        async with request.app.state.sessions() as session:
+            try:
+                stamp = await AsyncRecipeRepository.get_recipe_stamp(session, title)
+                if stamp is None:
+                    return JSONResponse({'message': 'Recipe not found'}, status_code=404)
+
+                etag = recipe_etag(stamp, self.sparse_fields())
+                if is_not_modified(request, etag, stamp.updated_at):
+                    return with_validators(Response(status_code=304), etag, stamp.updated_at)
+
+                recipe = await AsyncRecipeRepository.get_recipe_by_title(session, title, self.fields)
+            except SQLAlchemyError as e:
+                app.logger.error(f"Error fetching recipe: {str(e)}")
+                return JSONResponse({'message': 'An error occurred while fetching the recipe'}, status_code=500)
+
+        if recipe is None:
+            return JSONResponse({'message': 'Recipe not found'}, status_code=404)
+        return with_validators(json_response(serializer_for(self.fields).one(recipe)), etag, stamp.updated_at)
+
+    async def put(self, request):
+        return await self.write(request, operations.update_recipe, request.path_params['title'])
+
+    async def patch(self, request):
+        return await self.write(request, operations.patch_recipe, request.path_params['title'])
+
+    async def delete(self, request):
+        return await self.write(request, operations.delete_recipe, request.path_params['title'], with_body=False)
@@ -0,0 +1,88 @@
+from app import db
+from app.recipe import operations
+from app.recipe.model_repos.recipe_repo import RecipeRepository
+
+BATCH_MODES = ('atomic', 'continue')
+NOT_ATTEMPTED = 424
+
+
+def batch_errors(data, max_operations):
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list):
+        return 'Expected an object with an "operations" list'
+    if data.get('mode', 'atomic') not in BATCH_MODES:
+        return f'Mode must be one of: {", ".join(BATCH_MODES)}'
+    if not data['operations']:
+        return 'No operations given'
+    if len(data['operations']) > max_operations:
+        return f'At most {max_operations} operations per batch'
+    return None
+
+
+def apply_operation(operation, identity):
+    if not isinstance(operation, dict):
+        return {'message': 'Operation must be a JSON object'}, 400
+
+    op = operation.get('op')
+    title = operation.get('title')
+    data = operation.get('data')
+    if op not in ('create', 'update', 'patch', 'delete'):
+        return {'message': f'Unknown operation: {op}'}, 400
+    if op != 'create' and not isinstance(title, str):
+        return {'message': 'Missing fields: title'}, 400
+    if op != 'delete' and not isinstance(data, dict):
+        return {'message': 'Operation data must be a JSON object'}, 400
+
+    if op == 'create':
+        return operations.create_recipe(data, identity, commit=False)
+    if op == 'update':
+        return operations.update_recipe(title, data, identity, commit=False)
+    if op == 'patch':
+        return operations.patch_recipe(title, data, identity, commit=False)
+    return operations.delete_recipe(title, identity, commit=False)
+
+
+def run_batch(batch, identity, mode='atomic'):
+    # All operations share one transaction. In atomic mode the first failing
+    # operation rolls everything back; in continue mode each operation runs in
+    # a savepoint, so a failure only undoes that operation.
+    results = []
+    failed_status = None
+    pending = RecipeRepository.pending_after_commit()
+
+    try:
+        for index, operation in enumerate(batch):
+            op = operation.get('op') if isinstance(operation, dict) else None
+            if failed_status is not None:
+                results.append({'index': index, 'op': op, 'status': NOT_ATTEMPTED,
+                                'body': {'message': 'Not attempted: an earlier operation failed'}})
+                continue
+
+            if mode == 'continue':
+                savepoint = db.session.begin_nested()
+                mark = len(pending)
+                body, status_code = apply_operation(operation, identity)
+                if status_code < 400:
+                    savepoint.commit()
+                else:
+                    savepoint.rollback()
+                    del pending[mark:]
+            else:
+                body, status_code = apply_operation(operation, identity)
+                if status_code >= 400:
+                    failed_status = status_code
+
+            results.append({'index': index, 'op': op, 'status': status_code, 'body': body})
+
+        if failed_status is not None:
+            db.session.rollback()
+            pending.clear()
+        else:
+            db.session.commit()
+            RecipeRepository.run_after_commit()
+    except Exception:
+        db.session.rollback()
+        pending.clear()
+        raise
+
+    report = {'mode': mode, 'committed': failed_status is None, 'results': results}
+    return report, failed_status or 200
@@ -1,9 +1,21 @@
 from flask import Blueprint
-from app.recipe.routes import BaseRecipeView, CreateRecipeView, UpdateRecipeView, DeleteRecipeView
+from app.recipe.commands import reindex_command, backfill_ingredients_command, rebuild_stats_command, import_command, export_command
+from app.recipe.routes import BaseRecipeView, ExportRecipesView, SuggestRecipesView, RecipeStatsView, CreateRecipeView, BatchRecipesView, ImportRecipesView, UpdateRecipeView, DeleteRecipeView
 
 recipe_bp = Blueprint('recipes', __name__)
 recipe_bp.add_url_rule('/recipes', view_func=BaseRecipeView.as_view('get_recipes'))
 recipe_bp.add_url_rule('/recipes/<string:title>', view_func=BaseRecipeView.as_view('get_recipe_by_title'))
+recipe_bp.add_url_rule('/recipes/export', view_func=ExportRecipesView.as_view('export_recipes'))
+recipe_bp.add_url_rule('/recipes/suggest', view_func=SuggestRecipesView.as_view('suggest_recipes'))
+recipe_bp.add_url_rule('/recipes/stats', view_func=RecipeStatsView.as_view('recipe_stats'))
 recipe_bp.add_url_rule('/recipes', view_func=CreateRecipeView.as_view('create_recipe'))
+recipe_bp.add_url_rule('/recipes/batch', view_func=BatchRecipesView.as_view('batch_recipes'))
+recipe_bp.add_url_rule('/recipes/import', view_func=ImportRecipesView.as_view('import_recipes'))
 recipe_bp.add_url_rule('/recipes/<string:title>', view_func=UpdateRecipeView.as_view('update_recipe'))
 recipe_bp.add_url_rule('/recipes/<string:title>', view_func=DeleteRecipeView.as_view('delete_recipe'))
+
+recipe_bp.cli.add_command(reindex_command)
+recipe_bp.cli.add_command(backfill_ingredients_command)
+recipe_bp.cli.add_command(rebuild_stats_command)
+recipe_bp.cli.add_command(import_command)
+recipe_bp.cli.add_command(export_command)
@@ -0,0 +1,74 @@
+import json
+import uuid
+from flask import current_app
+from app.cache import LRUCache
+
+LIST_NAMESPACE = 'list'
+
+
+class RecipeCache:
+    # Caches the JSON bodies of recipe GET responses. Keys carry the response's
+    # ETag, which is derived from the database version stamp, so a write made
+    # by another process (or visible first on a replica) changes the key and
+    # the old body is never served under the new ETag. Entries are also keyed
+    # under a namespace token (one for all list pages, one per title) that
+    # local writes replace, so their stale entries are dropped right away.
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def init_app(self, app):
+        if app.config['RECIPE_CACHE_ENABLED']:
+            self.backend = LRUCache(
+                max_entries=app.config['RECIPE_CACHE_MAX_ENTRIES'],
+                default_ttl=app.config['RECIPE_CACHE_TTL']
+            )
+        else:
+            self.backend = None
+        app.extensions['recipe_cache'] = self
+
+    def _token(self, namespace):
+        token_key = f'recipes:token:{namespace}'
+        token = self.backend.get(token_key)
+        if token is None:
+            token = uuid.uuid4().hex
+            self.backend.set(token_key, token, ttl=0)
+        return token
+
+    def list_key(self, etag, **args):
+        return f'recipes:list:{self._token(LIST_NAMESPACE)}:{etag}:{json.dumps(args, sort_keys=True)}'
+
+    def title_key(self, title, etag, fields=None):
+        key = f'recipes:title:{self._token("title:" + title)}:{etag}'
+        return f'{key}:{",".join(fields)}' if fields else key
+
+    def cached(self, make_key, view):
+        if self.backend is None:
+            response, status_code = view()
+            response.status_code = status_code
+            return response
+
+        key = make_key()
+        body = self.backend.get(key)
+        if body is not None:
+            response = current_app.response_class(body, status=200, mimetype='application/json')
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        response, status_code = view()
+        response.status_code = status_code
+        if status_code == 200:
+            self.backend.set(key, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    def invalidate_recipe(self, *titles):
+        if self.backend is None:
+            return
+        self.backend.delete(f'recipes:token:{LIST_NAMESPACE}', *(f'recipes:token:title:{title}' for title in titles))
+
+    def stats(self):
+        return self.backend.stats() if self.backend is not None else {}
+
+
+recipe_cache = RecipeCache()
@@ -0,0 +1,146 @@
+from collections import Counter, namedtuple
+from sqlalchemy import select, insert, delete, intersect, and_
+from app import db
+from app.recipe.models import Recipe, Ingredient, IngredientName, recipe_ingredient
+
+LOOKUP_CHUNK_SIZE = 500
+
+IngredientFilter = namedtuple('IngredientFilter', ['include', 'exclude'])
+
+
+def canonical_name(name):
+    return ' '.join(name.lower().split())
+
+
+def parse_names(value):
+    names = {canonical_name(name) for name in (value or '').split(',')}
+    return tuple(sorted(name for name in names if name))
+
+
+def ingredient_filter(include, exclude):
+    # "with=Garlic, ginger&without=peanut" -> IngredientFilter(('garlic', 'ginger'), ('peanut',))
+    include, exclude = parse_names(include), parse_names(exclude)
+    if not (include or exclude):
+        return None
+    return IngredientFilter(include, exclude)
+
+
+def chunked(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class IngredientCatalog:
+    """Canonical ingredient names linked to the recipes that use them.
+
+    Kept in step with the free-text ``Ingredient`` rows by the recipe write
+    paths, so "recipes containing all of X and none of Y" is answered from the
+    link table's indexes instead of scanning ingredient names.
+    """
+
+    def _insert_names(self):
+        # Concurrent writers may add the same name; let the unique index settle it
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects import postgresql
+            return postgresql.insert(IngredientName).on_conflict_do_nothing(index_elements=['name'])
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects import sqlite
+            return sqlite.insert(IngredientName).on_conflict_do_nothing(index_elements=['name'])
+        return insert(IngredientName)
+
+    def _lookup(self, names):
+        ids = {}
+        for chunk in chunked(sorted(names)):
+            ids.update(db.session.execute(
+                select(IngredientName.name, IngredientName.id).where(IngredientName.name.in_(chunk))
+            ).all())
+        return ids
+
+    def ingredient_ids(self, names):
+        names = {canonical_name(name) for name in names} - {''}
+        ids = self._lookup(names)
+        missing = names - ids.keys()
+        if missing:
+            db.session.execute(self._insert_names(), [{'name': name} for name in sorted(missing)])
+            ids.update(self._lookup(missing))
+        return ids
+
+    def _linked_ids(self, recipe_ids):
+        return db.session.execute(
+            select(recipe_ingredient.c.ingredient_id).where(recipe_ingredient.c.recipe_id.in_(recipe_ids))
+        ).scalars().all()
+
+    def link_recipes(self, recipe_names, replace=True):
+        # recipe_names maps recipe ids to their ingredient names; pass
+        # replace=False for recipes that are known to have no links yet.
+        # Returns the change in linked recipes per ingredient name id.
+        usage = Counter()
+        if replace:
+            for chunk in chunked(recipe_names):
+                usage.subtract(self._linked_ids(chunk))
+                db.session.execute(delete(recipe_ingredient).where(recipe_ingredient.c.recipe_id.in_(chunk)))
+
+        ids = self.ingredient_ids(name for names in recipe_names.values() for name in names)
+        links = [
+            {'recipe_id': recipe_id, 'ingredient_id': ids[name]}
+            for recipe_id, names in recipe_names.items()
+            for name in sorted({canonical_name(name) for name in names} - {''})
+        ]
+        if links:
+            db.session.execute(insert(recipe_ingredient), links)
+        usage.update(link['ingredient_id'] for link in links)
+        return usage
+
+    def link_recipe(self, recipe_id, names, replace=True):
+        return self.link_recipes({recipe_id: names}, replace)
+
+    def unlink_recipe(self, recipe_id):
+        usage = Counter()
+        usage.subtract(self._linked_ids([recipe_id]))
+        db.session.execute(delete(recipe_ingredient).where(recipe_ingredient.c.recipe_id == recipe_id))
+        return usage
+
+    def _recipes_with(self, *names):
+        return (
+            select(recipe_ingredient.c.recipe_id)
+            .join(IngredientName, IngredientName.id == recipe_ingredient.c.ingredient_id)
+            .where(IngredientName.name.in_(names))
+        )
+
+    def recipe_filter(self, include=(), exclude=()):
+        # Each included name is one index range on the link table; the
+        # database intersects the recipe id sets.
+        conditions = []
+        if include:
+            matches = [self._recipes_with(name) for name in include]
+            conditions.append(Recipe.id.in_(intersect(*matches) if len(matches) > 1 else matches[0]))
+        if exclude:
+            conditions.append(Recipe.id.not_in(self._recipes_with(*exclude)))
+        return and_(*conditions)
+
+    def rebuild(self, batch_size=500):
+        db.session.execute(delete(recipe_ingredient))
+        linked = 0
+        last_id = 0
+        while True:
+            recipe_ids = db.session.execute(
+                select(Recipe.id).where(Recipe.id > last_id).order_by(Recipe.id).limit(batch_size)
+            ).scalars().all()
+            if not recipe_ids:
+                break
+            recipe_names = {recipe_id: [] for recipe_id in recipe_ids}
+            rows = db.session.execute(
+                select(Ingredient.recipe_id, Ingredient.name).where(Ingredient.recipe_id.in_(recipe_ids))
+            )
+            for recipe_id, name in rows:
+                recipe_names[recipe_id].append(name)
+            self.link_recipes(recipe_names, replace=False)
+            linked += len(recipe_ids)
+            last_id = recipe_ids[-1]
+        db.session.commit()
+        return linked
+
+
+ingredient_catalog = IngredientCatalog()
@@ -0,0 +1,45 @@
+from flask import current_app
+from app.singleflight import SingleFlight, FlightTimeout
+
+
+class ReadCoalescer:
+    # Collapses identical recipe reads that are in flight at the same time into
+    # one query and serialization. Keys include the ETag, which carries the
+    # recipe (or catalog) version and every query argument, so a waiting
+    # request only gets a body built from the version it saw itself. Waiters
+    # that time out run the read on their own. Coalescing is per process.
+
+    def __init__(self):
+        self.flights = SingleFlight()
+        self.enabled = False
+
+    def init_app(self, app):
+        self.enabled = app.config['RECIPE_COALESCE_ENABLED']
+        self.timeout = app.config['RECIPE_COALESCE_TIMEOUT']
+        self.flights = SingleFlight()
+        app.extensions['recipe_coalescer'] = self
+
+    def coalesced(self, key, view):
+        if not self.enabled:
+            return view()
+
+        def run():
+            # Responses are per request, so only their content is shared
+            response, status_code = view()
+            return response.get_data(), status_code, response.mimetype
+
+        try:
+            (body, status_code, mimetype), shared = self.flights.do(key, run, self.timeout)
+        except FlightTimeout:
+            return view()
+
+        response = current_app.response_class(body, status=status_code, mimetype=mimetype)
+        if shared:
+            response.headers['X-Coalesced'] = 'true'
+        return response, status_code
+
+    def stats(self):
+        return self.flights.stats()
+
+
+read_coalescer = ReadCoalescer()
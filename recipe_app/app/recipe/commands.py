@@ -0,0 +1,72 @@
+import json
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.auth.models import User
+from app.recipe.catalog import ingredient_catalog
+from app.recipe.exporter import EXPORT_MIMETYPES, export_recipes
+from app.recipe.importer import RecipeImporter, read_rows
+from app.recipe.search import search_index
+from app.recipe.stats import catalog_stats
+
+
+@click.command('reindex')
+@with_appcontext
+def reindex_command():
+    """Rebuild the full-text search index from the recipe tables."""
+    indexed = search_index.rebuild()
+    click.echo(f'Indexed {indexed} recipes')
+
+
+@click.command('backfill-ingredients')
+@click.option('--batch-size', type=int, default=500, help='Recipes read per round trip.')
+@with_appcontext
+def backfill_ingredients_command(batch_size):
+    """Rebuild the ingredient catalog and recipe links from the ingredient rows."""
+    linked = ingredient_catalog.rebuild(batch_size)
+    click.echo(f'Linked ingredients for {linked} recipes')
+    # Ingredient usage counts are derived from the links that were just replaced
+    catalog_stats.rebuild()
+    click.echo('Rebuilt recipe stats')
+
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Recompute the /recipes/stats counters from the recipe tables."""
+    totals = catalog_stats.rebuild()
+    click.echo(f'Counted {totals["recipes"]} recipes by {totals["authors"]} authors')
+
+
+@click.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--username', required=True, help='Author of the imported recipes.')
+@click.option('--format', 'input_format', type=click.Choice(['ndjson', 'json']), help='Defaults to json for *.json files, ndjson otherwise.')
+@click.option('--batch-size', type=int, help='Recipes per INSERT batch and commit.')
+@with_appcontext
+def import_command(source, username, input_format, batch_size):
+    """Bulk import recipes from an NDJSON or JSON array file ('-' for stdin)."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.BadParameter(f'No user named {username}', param_hint='--username')
+
+    if input_format is None:
+        input_format = 'json' if source.name.endswith('.json') else 'ndjson'
+    batch_size = batch_size or current_app.config['RECIPE_IMPORT_BATCH_SIZE']
+
+    rows = read_rows(source, input_format, current_app.config['RECIPE_IMPORT_MAX_ELEMENT_SIZE'])
+    report = RecipeImporter(user.id, batch_size).run(rows)
+    click.echo(json.dumps(report, indent=2))
+
+
+@click.command('export')
+@click.option('--format', 'export_format', type=click.Choice(sorted(EXPORT_MIMETYPES)), default='ndjson')
+@click.option('--search', 'search_query', default='', help='Only export recipes matching this search.')
+@click.option('--output', type=click.File('w'), default='-', help="Destination file, '-' for stdout.")
+@click.option('--chunk-size', type=int, help='Recipes fetched per round trip.')
+@with_appcontext
+def export_command(export_format, search_query, output, chunk_size):
+    """Stream every recipe as NDJSON or CSV."""
+    chunk_size = chunk_size or current_app.config['RECIPE_EXPORT_CHUNK_SIZE']
+    for chunk in export_recipes(export_format, search_query, chunk_size):
+        output.write(chunk)
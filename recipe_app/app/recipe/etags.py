@@ -0,0 +1,41 @@
+import hashlib
+import json
+from datetime import timezone
+from flask import request, current_app
+
+
+def recipe_etag(stamp, fields=None):
+    # updated_at tells apart recipes that got the id of a deleted one (SQLite
+    # reuses the highest rowid), which both start at version 1
+    etag = f'recipe-{stamp.id}-v{stamp.version}-{stamp.updated_at:%Y%m%d%H%M%S%f}'
+    return f'{etag}-{"+".join(fields)}' if fields else etag
+
+
+def catalog_etag(version, **args):
+    # The catalog version is bumped by every create, update and delete (see app.recipe.stats)
+    state = [version, args]
+    return 'recipes-' + hashlib.sha1(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def http_date(value):
+    return value.replace(microsecond=0, tzinfo=timezone.utc) if value is not None else None
+
+
+def is_not_modified(etag, last_modified=None):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return http_date(last_modified) <= request.if_modified_since
+    return False
+
+
+def not_modified(etag, last_modified=None):
+    response = current_app.response_class(status=304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = http_date(last_modified)
+    return response
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from sqlalchemy import select
+from app import db
+from app.recipe.models import Recipe, Ingredient
+from app.recipe.search import search_index
+from app.recipe.serializers import dumps
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+CSV_COLUMNS = ['id', 'title', 'description', 'instructions', 'ingredients']
+
+
+def iter_recipe_chunks(search_query='', chunk_size=1000):
+    # Streams plain rows through a server-side cursor (yield_per), so neither
+    # the result set nor the session identity map grows with the catalog, and
+    # loads the ingredients of each chunk with a single IN query.
+    query = select(Recipe.id, Recipe.title, Recipe.description, Recipe.instructions).order_by(Recipe.id)
+    matches = search_index.match(search_query)
+    if matches is not None:
+        query = query.join(matches, Recipe.id == matches.c.recipe_id)
+
+    result = db.session.execute(query.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        ingredients = defaultdict(list)
+        ingredient_rows = db.session.execute(
+            select(Ingredient.recipe_id, Ingredient.name, Ingredient.quantity)
+            .where(Ingredient.recipe_id.in_([row.id for row in partition]))
+            .order_by(Ingredient.id)
+        )
+        for ing in ingredient_rows:
+            ingredients[ing.recipe_id].append({'name': ing.name, 'quantity': ing.quantity})
+
+        yield [
+            {
+                'id': row.id,
+                'title': row.title,
+                'description': row.description,
+                'ingredients': ingredients[row.id],
+                'instructions': row.instructions
+            }
+            for row in partition
+        ]
+
+
+def iter_ndjson(chunks):
+    for recipes in chunks:
+        yield ''.join(dumps(recipe).decode('utf-8') + '\n' for recipe in recipes)
+
+
+def iter_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for recipes in chunks:
+        for recipe in recipes:
+            writer.writerow(dict(recipe, ingredients=json.dumps(recipe['ingredients'])))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+WRITERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
+
+
+def export_recipes(export_format, search_query='', chunk_size=1000):
+    return WRITERS[export_format](iter_recipe_chunks(search_query, chunk_size))
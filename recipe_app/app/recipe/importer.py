@@ -0,0 +1,261 @@
+import codecs
+import json
+import time
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.recipe.cache import recipe_cache
+from app.recipe.catalog import ingredient_catalog
+from app.recipe.models import Recipe, Ingredient
+from app.recipe.search import search_index, search_document
+from app.recipe.stats import catalog_stats
+from app.recipe.suggest import suggest_index
+from app.recipe.validation import missing_fields
+
+MAX_ELEMENT_SIZE = 1024 * 1024
+# Characters from the end of the buffer within which a decode error can be
+# caused by an element continuing in the next chunk (a cut literal or escape)
+TRUNCATION_MARGIN = 16
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+
+class ImportFormatError(ValueError):
+    def __init__(self, message, row):
+        super().__init__(message)
+        self.row = row
+
+
+class InvalidRow:
+    def __init__(self, message):
+        self.message = message
+
+
+def iter_ndjson(stream):
+    for row_number, line in enumerate(iter(stream.readline, b''), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, InvalidRow(f'Invalid JSON: {e}')
+
+
+class JsonArrayReader:
+    # Yields the elements of a top-level JSON array while holding at most one
+    # element plus one read chunk in memory. Elements larger than
+    # max_element_size characters are rejected rather than buffered.
+
+    def __init__(self, stream, chunk_size=64 * 1024, max_element_size=MAX_ELEMENT_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_element_size = max_element_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.row = 0
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.position = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return None
+
+    def _truncated(self, error):
+        # Only an error where decoding ran out of input can go away with more
+        # of it; an unterminated string reports where the string started.
+        return error.msg.startswith('Unterminated string') or error.pos >= len(self.buffer) - TRUNCATION_MARGIN
+
+    def _decode(self):
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                if self._truncated(e) and self._fill_element():
+                    continue
+                raise ImportFormatError(f'Invalid JSON: {e}', self.row)
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill_element():
+                continue
+            self._check_size(end - self.position)
+            self.position = end
+            return value
+
+    def _check_size(self, size):
+        if size > self.max_element_size:
+            raise ImportFormatError(f'Array element is larger than {self.max_element_size} characters', self.row)
+
+    def _fill_element(self):
+        self._check_size(len(self.buffer) - self.position)
+        return self._fill()
+
+    def __iter__(self):
+        if self._peek() != '[':
+            raise ImportFormatError('Expected a JSON array', self.row)
+        self.position += 1
+        if self._peek() == ']':
+            return
+
+        while True:
+            self.row += 1
+            self._peek()
+            yield self.row, self._decode()
+
+            separator = self._peek()
+            self.position += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ImportFormatError('Expected "," or "]" after array element', self.row)
+
+
+def read_rows(stream, input_format, max_element_size=MAX_ELEMENT_SIZE):
+    if input_format == 'ndjson':
+        return iter_ndjson(stream)
+    return iter(JsonArrayReader(stream, max_element_size=max_element_size))
+
+
+def format_for_mimetype(mimetype):
+    return 'ndjson' if mimetype in NDJSON_MIMETYPES else 'json'
+
+
+class RecipeImporter:
+
+    def __init__(self, user_id, batch_size=1000, max_errors=1000):
+        self.user_id = user_id
+        self.batch_size = max(batch_size, 1)
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []
+
+    def run(self, rows):
+        started = time.perf_counter()
+        batch = []
+        try:
+            for row_number, data in rows:
+                self.rows += 1
+                error = self.validate(data)
+                if error:
+                    self.record_error(row_number, error)
+                    continue
+
+                batch.append((row_number, data))
+                if len(batch) >= self.batch_size:
+                    self.insert_batch(batch)
+                    batch = []
+        except ImportFormatError as e:
+            self.rows += 1
+            self.record_error(e.row, str(e))
+
+        if batch:
+            self.insert_batch(batch)
+        return self.report(time.perf_counter() - started)
+
+    def validate(self, data):
+        if isinstance(data, InvalidRow):
+            return data.message
+        if not isinstance(data, dict):
+            return 'Row must be a JSON object'
+
+        missing = missing_fields(data)
+        if missing:
+            return f'Missing fields: {", ".join(missing)}'
+
+        if not isinstance(data['title'], str) or len(data['title']) > Recipe.title.type.length:
+            return f'Title must be a string of at most {Recipe.title.type.length} characters'
+        # A value the column cannot store would fail the whole batch's INSERT
+        for field in ('description', 'instructions'):
+            if not isinstance(data.get(field), (str, type(None))):
+                return f'{field.capitalize()} must be a string'
+        if not isinstance(data['ingredients'], list):
+            return 'Ingredients must be a list'
+        for ing in data['ingredients']:
+            if not isinstance(ing, dict) or not isinstance(ing.get('name'), str):
+                return 'Each ingredient needs a name'
+            if isinstance(ing.get('quantity'), (dict, list)):
+                return 'Ingredient quantity must be a string or number'
+            if len(ing['name']) > Ingredient.name.type.length or len(str(ing.get('quantity') or '')) > Ingredient.quantity.type.length:
+                return 'Ingredient name or quantity is too long'
+        return None
+
+    def insert_batch(self, batch):
+        # One multi-row INSERT for the recipes, one executemany each for their
+        # ingredients, catalog links, search documents and stats, committed together.
+        recipes = [
+            {
+                'title': data['title'],
+                'description': data.get('description'),
+                'instructions': data.get('instructions'),
+                'created_by': self.user_id
+            }
+            for _, data in batch
+        ]
+        try:
+            recipe_ids = db.session.execute(
+                insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True), recipes
+            ).scalars().all()
+
+            ingredients = [
+                {'name': ing['name'], 'quantity': ing.get('quantity'), 'recipe_id': recipe_id}
+                for recipe_id, (_, data) in zip(recipe_ids, batch)
+                for ing in data['ingredients']
+            ]
+            if ingredients:
+                db.session.execute(insert(Ingredient), ingredients)
+
+            usage = ingredient_catalog.link_recipes({
+                recipe_id: [ing['name'] for ing in data['ingredients']]
+                for recipe_id, (_, data) in zip(recipe_ids, batch)
+            }, replace=False)
+            catalog_stats.recipes_added(self.user_id, len(ingredients), usage, recipes=len(recipe_ids))
+
+            search_index.index_recipes([
+                search_document(recipe_id, data['title'], data.get('description'), [ing['name'] for ing in data['ingredients']])
+                for recipe_id, (_, data) in zip(recipe_ids, batch)
+            ], replace=False)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            for row_number, _ in batch:
+                self.record_error(row_number, f'Database error: {e.__class__.__name__}')
+            return
+
+        recipe_cache.invalidate_recipe(*(data['title'] for _, data in batch))
+        suggest_index.apply(added=[(data['title'], [ing['name'] for ing in data['ingredients']]) for _, data in batch])
+        self.imported += len(batch)
+        self.batches += 1
+
+    def record_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def report(self, elapsed):
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'failed': self.failed,
+            'batches': self.batches,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.imported / elapsed, 1) if elapsed else None,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
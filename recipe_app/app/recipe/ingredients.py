@@ -0,0 +1,87 @@
+from collections import defaultdict, deque
+
+
+def apply_ingredient_changes(stored, changes):
+    # Applies a PATCH 'ingredient_changes' document ({'set': [...], 'remove': [...]})
+    # to the stored ingredient rows and returns the desired ingredient list.
+    removed = set(changes.get('remove', []))
+    desired = [{'name': row.name, 'quantity': row.quantity} for row in stored if row.name not in removed]
+    for ing in changes.get('set', []):
+        existing = next((item for item in desired if item['name'] == ing['name']), None)
+        if existing is None:
+            desired.append({'name': ing['name'], 'quantity': ing.get('quantity')})
+        else:
+            existing['quantity'] = ing.get('quantity')
+    return desired
+
+
+def diff_ingredients(stored, desired):
+    # Returns (inserts, updates, deletes) turning the stored rows (with id, name
+    # and quantity, in id order) into the desired list. Ingredients are listed
+    # in id order, so when the value matching below would leave them in a
+    # different order than desired (e.g. a PUT that only reorders them), the
+    # rows are rewritten by position instead.
+    changes = match_ingredients(stored, desired)
+    if resulting_order(stored, *changes) == [(ing['name'], ing.get('quantity')) for ing in desired]:
+        return changes
+    return diff_by_position(stored, desired)
+
+
+def resulting_order(stored, inserts, updates, deletes):
+    updated = {change['id']: (change['name'], change['quantity']) for change in updates}
+    removed = set(deletes)
+    rows = [updated.get(row.id, (row.name, row.quantity)) for row in stored if row.id not in removed]
+    return rows + [(ing['name'], ing['quantity']) for ing in inserts]
+
+
+def diff_by_position(stored, desired):
+    updates = [
+        {'id': row.id, 'name': ing['name'], 'quantity': ing.get('quantity')}
+        for row, ing in zip(stored, desired)
+        if (row.name, row.quantity) != (ing['name'], ing.get('quantity'))
+    ]
+    inserts = [{'name': ing['name'], 'quantity': ing.get('quantity')} for ing in desired[len(stored):]]
+    deletes = [row.id for row in stored[len(desired):]]
+    return inserts, updates, deletes
+
+
+def match_ingredients(stored, desired):
+    # Unchanged rows are left alone, rows whose name survives get their
+    # quantity updated, and leftover rows are reused for new ingredients
+    # before anything is inserted or deleted.
+    by_value = defaultdict(deque)
+    for row in stored:
+        by_value[(row.name, row.quantity)].append(row)
+
+    pending = []
+    for ing in desired:
+        rows = by_value.get((ing['name'], ing.get('quantity')))
+        if rows:
+            rows.popleft()
+        else:
+            pending.append(ing)
+
+    by_name = defaultdict(deque)
+    for rows in by_value.values():
+        for row in rows:
+            by_name[row.name].append(row)
+
+    updates = []
+    unmatched = []
+    for ing in pending:
+        rows = by_name.get(ing['name'])
+        if rows:
+            updates.append({'id': rows.popleft().id, 'name': ing['name'], 'quantity': ing.get('quantity')})
+        else:
+            unmatched.append(ing)
+
+    leftovers = deque(row for rows in by_name.values() for row in rows)
+    inserts = []
+    for ing in unmatched:
+        if leftovers:
+            updates.append({'id': leftovers.popleft().id, 'name': ing['name'], 'quantity': ing.get('quantity')})
+        else:
+            inserts.append({'name': ing['name'], 'quantity': ing.get('quantity')})
+
+    deletes = [row.id for row in leftovers]
+    return inserts, updates, deletes
@@ -0,0 +1,120 @@
+from math import ceil
+from sqlalchemy import and_, or_, text, func, select
+from sqlalchemy.orm import joinedload
+from app.recipe.catalog import ingredient_catalog
+from app.recipe.model_repos.recipe_repo import RecipeRepository
+from app.recipe.models import Recipe, CatalogTotals
+from app.recipe.pagination import CursorPage, cursor_page_size, decode_cursor, encode_cursor
+from app.recipe.search import search_index
+from app.recipe.serializers import RECIPE_FIELDS
+from app.recipe.stats import TOTALS_ID
+
+
+class OffsetPage:
+    # The parts of Flask-SQLAlchemy's Pagination the list view reads
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = ceil(total / per_page) if total else 0
+
+
+class AsyncRecipeRepository:
+    # Read paths of RecipeRepository for the ASGI app, issuing the same queries
+    # through an AsyncSession. Filters, search matches and load options are
+    # built by the shared helpers; only the execution is awaited. Writes keep
+    # going through RecipeRepository (see app.asgi).
+
+    @staticmethod
+    def filtered(query, search_query, ingredients):
+        if ingredients:
+            query = query.where(ingredient_catalog.recipe_filter(*ingredients))
+        return query, search_index.match(search_query)
+
+    @staticmethod
+    async def get_recipes(session, page, per_page, search_query, fields=RECIPE_FIELDS, ingredients=None):
+        # paginate(error_out=False) falls back to the first page of 20
+        page = page if page >= 1 else 1
+        per_page = per_page if per_page >= 1 else 20
+
+        query, matches = AsyncRecipeRepository.filtered(
+            select(Recipe).options(*RecipeRepository.load_options(fields)), search_query, ingredients
+        )
+        if matches is not None:
+            query = query.join(matches, Recipe.id == matches.c.recipe_id).order_by(matches.c.score.desc(), Recipe.id)
+        else:
+            query = query.order_by(Recipe.id)
+
+        total = await session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        items = (await session.scalars(query.limit(per_page).offset((page - 1) * per_page))).all()
+        return OffsetPage(items, page, per_page, total)
+
+    @staticmethod
+    async def get_recipes_after(session, cursor, per_page, search_query, total=None, fields=RECIPE_FIELDS, ingredients=None):
+        key = decode_cursor(cursor) if cursor else None
+        per_page = cursor_page_size(per_page)
+        query, matches = AsyncRecipeRepository.filtered(
+            select(Recipe).options(*RecipeRepository.load_options(fields)), search_query, ingredients
+        )
+        if matches is not None:
+            query = query.join(matches, Recipe.id == matches.c.recipe_id).add_columns(matches.c.score)
+            if key:
+                score = key.get('score', 0)
+                query = query.where(or_(matches.c.score < score, and_(matches.c.score == score, Recipe.id > key['id'])))
+            query = query.order_by(matches.c.score.desc(), Recipe.id)
+        else:
+            if key:
+                query = query.where(Recipe.id > key['id'])
+            query = query.order_by(Recipe.id)
+
+        result = await session.execute(query.limit(per_page + 1))
+        rows = result.all() if matches is not None else result.scalars().all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+
+        if matches is not None:
+            recipes = [recipe for recipe, _ in rows]
+            last_key = {'id': rows[-1][0].id, 'score': rows[-1][1]} if rows else None
+        else:
+            recipes = rows
+            last_key = {'id': rows[-1].id} if rows else None
+
+        next_cursor = encode_cursor(last_key) if has_more and last_key else None
+        count = await AsyncRecipeRepository.count_recipes(session, search_query, total, ingredients)
+        return CursorPage(recipes, per_page, next_cursor, count)
+
+    @staticmethod
+    async def count_recipes(session, search_query, mode, ingredients=None):
+        if mode not in ('exact', 'estimate'):
+            return None
+
+        query, matches = AsyncRecipeRepository.filtered(select(Recipe.id), search_query, ingredients)
+        if mode == 'estimate' and matches is None and not ingredients and session.bind.dialect.name == 'postgresql':
+            estimate = await session.scalar(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'recipe'::regclass"))
+            if estimate is not None and estimate >= 0:
+                return estimate
+
+        if matches is not None:
+            query = query.join(matches, Recipe.id == matches.c.recipe_id)
+        return await session.scalar(select(func.count()).select_from(query.subquery()))
+
+    @staticmethod
+    async def get_recipe_by_title(session, title, fields=RECIPE_FIELDS):
+        options = RecipeRepository.load_options(fields, ingredient_loader=joinedload)
+        result = await session.execute(
+            select(Recipe).options(*options).filter_by(title=title).order_by(Recipe.id).limit(1)
+        )
+        return result.unique().scalars().first()
+
+    @staticmethod
+    async def get_recipe_stamp(session, title):
+        result = await session.execute(
+            select(Recipe.id, Recipe.version, Recipe.updated_at).filter_by(title=title).order_by(Recipe.id).limit(1)
+        )
+        return result.first()
+
+    @staticmethod
+    async def get_catalog_version(session):
+        result = await session.execute(select(CatalogTotals.version).where(CatalogTotals.id == TOTALS_ID))
+        return result.scalar() or 0
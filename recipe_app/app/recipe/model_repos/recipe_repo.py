@@ -1,69 +1,255 @@
+from sqlalchemy import and_, or_, text, select, delete, insert, update
 from app import db
+from app.replicas import reads_from_replica
+from app.recipe.cache import recipe_cache
+from app.recipe.catalog import ingredient_catalog
+from app.recipe.ingredients import apply_ingredient_changes, diff_ingredients
 from app.recipe.models import Recipe, Ingredient
+from app.recipe.pagination import CursorPage, cursor_page_size, decode_cursor, encode_cursor
+from app.recipe.search import search_index
+from app.recipe.serializers import RECIPE_FIELDS
+from app.recipe.stats import catalog_stats
+from app.recipe.suggest import suggest_index
+
+AFTER_COMMIT = 'recipe_after_commit'
 
 class RecipeRepository:
 
     @staticmethod
-    def create_recipe(data, user):
+    def finish_write(commit, after_commit):
+        # With commit=False the caller owns the transaction (e.g. a batch) and
+        # must call run_after_commit() once it has committed.
+        if commit:
+            db.session.commit()
+            after_commit()
+        else:
+            db.session.info.setdefault(AFTER_COMMIT, []).append(after_commit)
+
+    @staticmethod
+    def pending_after_commit():
+        return db.session.info.setdefault(AFTER_COMMIT, [])
+
+    @staticmethod
+    def run_after_commit():
+        for after_commit in db.session.info.pop(AFTER_COMMIT, []):
+            after_commit()
+
+    @staticmethod
+    def create_recipe(data, user_id, commit=True):
         new_recipe = Recipe(
             title=data['title'], 
             description=data.get('description'), 
             instructions=data.get('instructions'), 
-            author=user
+            created_by=user_id
         )
         db.session.add(new_recipe)
         db.session.flush()  # Get the ID of the new recipe before committing
 
         ingredients = data.get('ingredients', [])
-        for ing in ingredients:
-            ingredient = Ingredient(name=ing['name'], quantity=ing.get('quantity'), recipe_id=new_recipe.id)
-            db.session.add(ingredient)
+        if ingredients:
+            db.session.execute(insert(Ingredient), [
+                {'name': ing['name'], 'quantity': ing.get('quantity'), 'recipe_id': new_recipe.id} for ing in ingredients
+            ])
+
+        usage = ingredient_catalog.link_recipe(new_recipe.id, [ing['name'] for ing in ingredients], replace=False)
+        catalog_stats.recipes_added(user_id, len(ingredients), usage)
+        search_index.index_recipe(new_recipe.id, new_recipe.title, new_recipe.description, [ing['name'] for ing in ingredients])
+        title = new_recipe.title
 
-        db.session.commit()
+        def after_commit():
+            recipe_cache.invalidate_recipe(title)
+            suggest_index.recipe_added(title, [ing['name'] for ing in ingredients])
+
+        RecipeRepository.finish_write(commit, after_commit)
         return new_recipe
 
     @staticmethod
-    def get_recipes(page, per_page, search_query):
-        query = Recipe.query.options(db.joinedload(Recipe.ingredients))
+    def load_options(fields, ingredient_loader=db.selectinload):
+        # Only the requested columns are loaded, and ingredients are not
+        # queried at all unless they are part of the response.
+        columns = [getattr(Recipe, name) for name in fields if name not in ('id', 'ingredients')]
+        options = [db.load_only(Recipe.id, *columns)]
+        if 'ingredients' in fields:
+            options.append(ingredient_loader(Recipe.ingredients))
+        return options
+
+    @staticmethod
+    @reads_from_replica
+    def get_recipes(page, per_page, search_query, fields=RECIPE_FIELDS, ingredients=None):
+        query = Recipe.query.options(*RecipeRepository.load_options(fields))
+        if ingredients:
+            query = query.filter(ingredient_catalog.recipe_filter(*ingredients))
         
-        if search_query:
-            query = query.filter((Recipe.title.ilike(f'%{search_query}%')) | (Recipe.ingredients.any(Ingredient.name.ilike(f'%{search_query}%'))))
+        matches = search_index.match(search_query)
+        if matches is not None:
+            query = query.join(matches, Recipe.id == matches.c.recipe_id).order_by(matches.c.score.desc(), Recipe.id)
+        else:
+            query = query.order_by(Recipe.id)
 
         paginated_recipes = query.paginate(page=page, per_page=per_page, error_out=False)
         return paginated_recipes
 
     @staticmethod
-    def get_recipe_by_title(title):
-        return Recipe.query.options(db.joinedload(Recipe.ingredients)).filter_by(title=title).first_or_404()
+    @reads_from_replica
+    def get_recipes_after(cursor, per_page, search_query, total=None, fields=RECIPE_FIELDS, ingredients=None):
+        # Seeks past the last row of the previous page on (id) or, when searching,
+        # (score desc, id) so every page costs the same regardless of depth.
+        key = decode_cursor(cursor) if cursor else None
+        per_page = cursor_page_size(per_page)
+        # selectinload fetches the ingredients of the whole page in one batched IN query
+        query = db.session.query(Recipe).options(*RecipeRepository.load_options(fields))
+        if ingredients:
+            query = query.filter(ingredient_catalog.recipe_filter(*ingredients))
+
+        matches = search_index.match(search_query)
+        if matches is not None:
+            query = query.join(matches, Recipe.id == matches.c.recipe_id).add_columns(matches.c.score)
+            if key:
+                score = key.get('score', 0)
+                query = query.filter(or_(matches.c.score < score, and_(matches.c.score == score, Recipe.id > key['id'])))
+            query = query.order_by(matches.c.score.desc(), Recipe.id)
+        else:
+            if key:
+                query = query.filter(Recipe.id > key['id'])
+            query = query.order_by(Recipe.id)
+
+        rows = query.limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+
+        if matches is not None:
+            recipes = [recipe for recipe, _ in rows]
+            last_key = {'id': rows[-1][0].id, 'score': rows[-1][1]} if rows else None
+        else:
+            recipes = rows
+            last_key = {'id': rows[-1].id} if rows else None
+
+
+        next_cursor = encode_cursor(last_key) if has_more and last_key else None
+        return CursorPage(recipes, per_page, next_cursor, RecipeRepository.count_recipes(search_query, total, ingredients))
+
+    @staticmethod
+    @reads_from_replica
+    def count_recipes(search_query, mode, ingredients=None):
+        if mode not in ('exact', 'estimate'):
+            return None
+
+        matches = search_index.match(search_query)
+        if mode == 'estimate' and matches is None and not ingredients and db.engine.dialect.name == 'postgresql':
+            estimate = db.session.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'recipe'::regclass")).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+
+        query = db.session.query(Recipe.id)
+        if ingredients:
+            query = query.filter(ingredient_catalog.recipe_filter(*ingredients))
+        if matches is not None:
+            query = query.join(matches, Recipe.id == matches.c.recipe_id)
+        return query.count()
 
     @staticmethod
-    def update_recipe(title, data, user):
-        recipe = Recipe.query.filter_by(title=title).first_or_404()
+    @reads_from_replica
+    def get_recipe_by_title(title, fields=RECIPE_FIELDS):
+        options = RecipeRepository.load_options(fields, ingredient_loader=db.joinedload)
+        return Recipe.query.options(*options).filter_by(title=title).order_by(Recipe.id).first_or_404()
 
-        if recipe.author != user:
+    @staticmethod
+    @reads_from_replica
+    def get_recipe_stamp(title):
+        return (
+            db.session.query(Recipe.id, Recipe.version, Recipe.updated_at)
+            .filter_by(title=title)
+            .order_by(Recipe.id)
+            .first()
+        )
+
+    @staticmethod
+    def get_catalog_version():
+        return catalog_stats.version()
+
+    @staticmethod
+    def update_recipe(title, data, user_id, commit=True):
+        return RecipeRepository.save_recipe(title, data, user_id, partial=False, commit=commit)
+
+    @staticmethod
+    def patch_recipe(title, data, user_id, commit=True):
+        return RecipeRepository.save_recipe(title, data, user_id, partial=True, commit=commit)
+
+    @staticmethod
+    def save_recipe(title, data, user_id, partial, commit=True):
+        recipe = Recipe.query.filter_by(title=title).order_by(Recipe.id).first_or_404()
+
+        if recipe.created_by != user_id:
             return None, 403
 
-        recipe.title = data['title']
-        recipe.description = data.get('description')
-        recipe.instructions = data.get('instructions')
+        old_title = recipe.title
+        changed_fields = set()
+        for field in ('title', 'description', 'instructions'):
+            if partial and field not in data:
+                continue
+            if getattr(recipe, field) != data.get(field):
+                setattr(recipe, field, data.get(field))
+                changed_fields.add(field)
 
-        Ingredient.query.filter_by(recipe_id=recipe.id).delete()
-        ingredients = data.get('ingredients', [])
-        for ing in ingredients:
-            ingredient = Ingredient(name=ing['name'], quantity=ing.get('quantity'), recipe_id=recipe.id)
-            db.session.add(ingredient)
+        stored = (
+            db.session.query(Ingredient.id, Ingredient.name, Ingredient.quantity)
+            .filter_by(recipe_id=recipe.id)
+            .order_by(Ingredient.id)
+            .all()
+        )
+        if 'ingredients' in data or not partial:
+            desired = data.get('ingredients', [])
+        elif 'ingredient_changes' in data:
+            desired = apply_ingredient_changes(stored, data['ingredient_changes'])
+        else:
+            desired = [{'name': row.name, 'quantity': row.quantity} for row in stored]
+
+        inserts, updates, deletes = diff_ingredients(stored, desired)
+        if deletes:
+            db.session.execute(delete(Ingredient).where(Ingredient.id.in_(deletes)))
+        if updates:
+            db.session.execute(update(Ingredient), updates)
+        if inserts:
+            db.session.execute(insert(Ingredient), [dict(ing, recipe_id=recipe.id) for ing in inserts])
+
+        if not (changed_fields or inserts or updates or deletes):
+            return recipe, 200
 
-        db.session.commit()
+        recipe.touch()
+        names_changed = sorted(row.name for row in stored) != sorted(ing['name'] for ing in desired)
+        usage = None
+        if names_changed:
+            usage = ingredient_catalog.link_recipe(recipe.id, [ing['name'] for ing in desired])
+        catalog_stats.record(ingredients=len(inserts) - len(deletes), usage=usage)
+        if changed_fields & {'title', 'description'} or names_changed:
+            search_index.index_recipe(recipe.id, recipe.title, recipe.description, [ing['name'] for ing in desired])
+        new_title = recipe.title
+
+        def after_commit():
+            recipe_cache.invalidate_recipe(old_title, new_title)
+            if old_title != new_title or names_changed:
+                suggest_index.recipe_changed(old_title, [row.name for row in stored], new_title, [ing['name'] for ing in desired])
+
+        RecipeRepository.finish_write(commit, after_commit)
         return recipe, 200
 
     @staticmethod
-    def delete_recipe(title, user):
-        recipe = Recipe.query.filter_by(title=title).first_or_404()
+    def delete_recipe(title, user_id, commit=True):
+        recipe = db.session.query(Recipe.id, Recipe.created_by).filter_by(title=title).order_by(Recipe.id).first_or_404()
 
-        if recipe.author != user:
+        if recipe.created_by != user_id:
             return None, 403
 
-        Ingredient.query.filter_by(recipe_id=recipe.id).delete()
-        db.session.delete(recipe)
-        db.session.commit()
+        names = db.session.execute(select(Ingredient.name).where(Ingredient.recipe_id == recipe.id)).scalars().all()
+        search_index.remove_recipe(recipe.id)
+        usage = ingredient_catalog.unlink_recipe(recipe.id)
+        catalog_stats.recipe_removed(recipe.created_by, len(names), usage)
+        db.session.execute(delete(Ingredient).where(Ingredient.recipe_id == recipe.id))
+        db.session.execute(delete(Recipe).where(Recipe.id == recipe.id))
+
+        def after_commit():
+            recipe_cache.invalidate_recipe(title)
+            suggest_index.recipe_removed(title, names)
+
+        RecipeRepository.finish_write(commit, after_commit)
         return recipe, 200
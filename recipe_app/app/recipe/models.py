@@ -1,15 +1,56 @@
+from datetime import datetime
 from app import db
 
 class Recipe(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    ingredients = db.relationship('Ingredient', backref='recipe', lazy=True)
+    ingredients = db.relationship('Ingredient', backref='recipe', lazy=True, order_by='Ingredient.id')
     instructions = db.Column(db.Text, nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Server defaults let `flask init-db` add these columns to an existing table
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.now(), index=True)
+
+    def touch(self):
+        self.version = (self.version or 0) + 1
+        self.updated_at = datetime.utcnow()
 
 class Ingredient(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
     quantity = db.Column(db.String(50), nullable=True)
     recipe_id = db.Column(db.Integer, db.ForeignKey('recipe.id'), nullable=False)
+
+class IngredientName(db.Model):
+    # Canonical ingredient dictionary; recipes link to it through recipe_ingredient.
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(150), nullable=False, unique=True)
+
+# The primary key serves ingredient -> recipes lookups, the second index recipe -> ingredients.
+recipe_ingredient = db.Table(
+    'recipe_ingredient',
+    db.Column('ingredient_id', db.Integer, db.ForeignKey('ingredient_name.id'), primary_key=True),
+    db.Column('recipe_id', db.Integer, db.ForeignKey('recipe.id'), primary_key=True),
+    db.Index('ix_recipe_ingredient_recipe_id', 'recipe_id', 'ingredient_id')
+)
+
+# Summary counters behind /recipes/stats, updated by the recipe write paths in
+# the same transaction as the rows they count (see app.recipe.stats).
+class AuthorStats(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    recipes = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+class IngredientStats(db.Model):
+    ingredient_id = db.Column(db.Integer, db.ForeignKey('ingredient_name.id'), primary_key=True)
+    recipes = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+class CatalogTotals(db.Model):
+    # A single row (id 1). version is bumped by every recipe write and
+    # validates the list responses.
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    recipes = db.Column(db.Integer, nullable=False, default=0)
+    ingredients = db.Column(db.Integer, nullable=False, default=0)
+    authors = db.Column(db.Integer, nullable=False, default=0)
+    distinct_ingredients = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,72 @@
+from flask import current_app as app
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.exceptions import NotFound
+from app.recipe.model_repos.recipe_repo import RecipeRepository
+from app.recipe.serializers import serializer_for
+from app.recipe.validation import missing_fields, patch_errors
+
+# Each write operation returns (payload, status_code). The single-recipe views
+# and POST /recipes/batch both go through these, so a batched operation gets
+# exactly the status and body the individual request would have.
+
+
+def run_operation(action, operation):
+    try:
+        return operation()
+    except NotFound:
+        return {'message': 'Recipe not found'}, 404
+    except SQLAlchemyError as e:
+        app.logger.error(f"Error {action} recipe: {str(e)}")
+        return {'message': f'An error occurred while {action} the recipe'}, 500
+    except Exception as e:
+        app.logger.error(f"Error: {str(e)}")
+        return {'message': str(e)}, 500
+
+
+def create_recipe(data, identity, commit=True):
+    missing = missing_fields(data)
+    if missing:
+        return {'message': f'Missing fields: {", ".join(missing)}'}, 400
+
+    def create():
+        new_recipe = RecipeRepository.create_recipe(data, identity.id, commit=commit)
+        return {
+            'message': 'Recipe created successfully',
+            'recipe': dict(serializer_for().one(new_recipe), created_by=identity.username)
+        }, 201
+
+    return run_operation('creating', create)
+
+
+def update_recipe(title, data, identity, commit=True):
+    missing = missing_fields(data)
+    if missing:
+        return {'message': f'Missing fields: {", ".join(missing)}'}, 400
+    return save_recipe(title, data, identity, RecipeRepository.update_recipe, commit)
+
+
+def patch_recipe(title, data, identity, commit=True):
+    error = patch_errors(data)
+    if error:
+        return {'message': error}, 400
+    return save_recipe(title, data, identity, RecipeRepository.patch_recipe, commit)
+
+
+def save_recipe(title, data, identity, save, commit):
+    def update():
+        recipe, status_code = save(title, data, identity.id, commit=commit)
+        if status_code == 403:
+            return {'message': 'You can only edit your own recipes'}, 403
+        return {'message': 'Recipe updated successfully'}, 200
+
+    return run_operation('updating', update)
+
+
+def delete_recipe(title, identity, commit=True):
+    def remove():
+        recipe, status_code = RecipeRepository.delete_recipe(title, identity.id, commit=commit)
+        if status_code == 403:
+            return {'message': 'You can only delete your own recipes'}, 403
+        return {'message': 'Recipe deleted successfully'}, 200
+
+    return run_operation('deleting', remove)
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    def __init__(self, items, per_page, next_cursor=None, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.total = total
+
+
+def cursor_page_size(per_page):
+    # Same fallback as paginate(error_out=False) in page mode
+    return per_page if per_page >= 1 else 20
+
+
+def encode_cursor(key):
+    payload = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise InvalidCursor(cursor)
+
+    # bool is an int subclass, but true/false are no ids or scores
+    if not isinstance(key, dict) or not isinstance(key.get('id'), int) or isinstance(key['id'], bool):
+        raise InvalidCursor(cursor)
+    if 'score' in key and (not isinstance(key['score'], (int, float)) or isinstance(key['score'], bool)):
+        raise InvalidCursor(cursor)
+    return key
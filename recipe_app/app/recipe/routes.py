@@ -1,45 +1,135 @@
-from flask import request, jsonify, current_app as app
+from flask import request, jsonify, stream_with_context, current_app as app
 from flask.views import MethodView
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.auth.models import User
+from app.auth.identity import identity_required, current_identity
+from app.instrumentation import request_metrics
+from app.recipe import operations
+from app.recipe.batch import batch_errors, run_batch
+from app.recipe.cache import recipe_cache
+from app.recipe.catalog import ingredient_filter
+from app.recipe.coalescing import read_coalescer
+from app.recipe.exporter import EXPORT_MIMETYPES, export_recipes
+from app.recipe.importer import RecipeImporter, read_rows, format_for_mimetype
+from app.recipe.etags import recipe_etag, catalog_etag, is_not_modified, not_modified, with_validators
 from app.recipe.model_repos.recipe_repo import RecipeRepository
+from app.recipe.pagination import InvalidCursor
+from app.recipe.serializers import RECIPE_FIELDS, InvalidFields, json_response, parse_fields, serializer_for
+from app.recipe.stats import catalog_stats
+from app.recipe.suggest import suggest_index
 from sqlalchemy.exc import SQLAlchemyError
 
 class BaseRecipeView(MethodView):
     def get(self, title=None):
-        if title:
-            return self.get_recipe_by_title(title)
-        else:
-            return self.get_all_recipes()
+        try:
+            self.fields = parse_fields(request.args.get('fields'))
+            self.ingredients = ingredient_filter(request.args.get('with'), request.args.get('without'))
+        except InvalidFields as e:
+            return jsonify({'message': str(e)}), 400
+
+        try:
+            if title:
+                return self.get_recipe_if_modified(title)
+            else:
+                return self.get_recipes_if_modified()
+        except SQLAlchemyError as e:
+            app.logger.error(f"Error checking recipe versions: {str(e)}")
+            return jsonify({'message': 'An error occurred while fetching the recipes'}), 500
+
+    def sparse_fields(self):
+        return self.fields if self.fields != RECIPE_FIELDS else None
+
+    def get_recipe_if_modified(self, title):
+        # The version stamp is read without touching ingredients, so unchanged
+        # recipes are answered with a 304 before anything is loaded or serialized.
+        stamp = RecipeRepository.get_recipe_stamp(title)
+        if stamp is None:
+            return jsonify({'message': 'Recipe not found'}), 404
+
+        etag = recipe_etag(stamp, self.sparse_fields())
+        if is_not_modified(etag, stamp.updated_at):
+            return not_modified(etag, stamp.updated_at)
+
+        response = recipe_cache.cached(
+            lambda: recipe_cache.title_key(title, etag, self.sparse_fields()),
+            lambda: read_coalescer.coalesced(f'{request.path}:{etag}', lambda: self.get_recipe_by_title(title))
+        )
+        if response.status_code == 200:
+            with_validators(response, etag, stamp.updated_at)
+        return response
+
+    def get_recipes_if_modified(self):
+        args = self.list_args()
+        etag = catalog_etag(RecipeRepository.get_catalog_version(), **args)
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        response = recipe_cache.cached(
+            lambda: recipe_cache.list_key(etag, **args),
+            lambda: read_coalescer.coalesced(f'{request.path}:{etag}', self.get_all_recipes)
+        )
+        if response.status_code == 200:
+            with_validators(response, etag)
+        return response
+
+    def list_args(self):
+        return {
+            'page': request.args.get('page', 1, type=int),
+            'per_page': request.args.get('per_page', 10, type=int),
+            'search': request.args.get('search', '', type=str),
+            'cursor': request.args.get('cursor'),
+            'total': request.args.get('total'),
+            'fields': ','.join(self.fields),
+            'with': ','.join(self.ingredients.include) if self.ingredients else '',
+            'without': ','.join(self.ingredients.exclude) if self.ingredients else ''
+        }
 
     def get_all_recipes(self):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         search_query = request.args.get('search', '', type=str)
 
+        if 'cursor' in request.args:
+            return self.get_recipes_by_cursor(request.args['cursor'], per_page, search_query)
+
         try:
-            paginated_recipes = RecipeRepository.get_recipes(page, per_page, search_query)
-            recipes = paginated_recipes.items
-            output = [
-                {
-                    'id': recipe.id,
-                    'title': recipe.title,
-                    'description': recipe.description,
-                    'ingredients': [{'name': ing.name, 'quantity': ing.quantity} for ing in recipe.ingredients],
-                    'instructions': recipe.instructions
+            paginated_recipes = RecipeRepository.get_recipes(page, per_page, search_query, self.fields, self.ingredients)
+            with request_metrics.timer('serialize'):
+                meta = {
+                    'page': paginated_recipes.page,
+                    'pages': paginated_recipes.pages,
+                    'per_page': paginated_recipes.per_page,
+                    'total': paginated_recipes.total
                 }
-                for recipe in recipes
-            ]
-            meta = {
-                'page': paginated_recipes.page,
-                'pages': paginated_recipes.pages,
-                'per_page': paginated_recipes.per_page,
-                'total': paginated_recipes.total
-            }
-            return jsonify({
-                'meta': meta,
-                'recipes': output
-            }), 200
+                return json_response({
+                    'meta': meta,
+                    'recipes': serializer_for(self.fields).many(paginated_recipes.items)
+                }), 200
+        except SQLAlchemyError as e:
+            app.logger.error(f"Error fetching recipes: {str(e)}")
+            return jsonify({'message': 'An error occurred while fetching the recipes'}), 500
+        except Exception as e:
+            app.logger.error(f"Error: {str(e)}")
+            return jsonify({'message': str(e)}), 500
+
+    def get_recipes_by_cursor(self, cursor, per_page, search_query):
+        total = request.args.get('total', type=str)
+
+        try:
+            recipes_page = RecipeRepository.get_recipes_after(
+                cursor, per_page, search_query, total, self.fields, self.ingredients
+            )
+            with request_metrics.timer('serialize'):
+                meta = {
+                    'per_page': recipes_page.per_page,
+                    'next_cursor': recipes_page.next_cursor
+                }
+                if recipes_page.total is not None:
+                    meta['total'] = recipes_page.total
+                return json_response({
+                    'meta': meta,
+                    'recipes': serializer_for(self.fields).many(recipes_page.items)
+                }), 200
+        except InvalidCursor:
+            return jsonify({'message': 'Invalid cursor'}), 400
         except SQLAlchemyError as e:
             app.logger.error(f"Error fetching recipes: {str(e)}")
             return jsonify({'message': 'An error occurred while fetching the recipes'}), 500
@@ -49,14 +139,9 @@ class BaseRecipeView(MethodView):
 
     def get_recipe_by_title(self, title):
         try:
-            recipe = RecipeRepository.get_recipe_by_title(title)
-            return jsonify({
-                'id': recipe.id,
-                'title': recipe.title,
-                'description': recipe.description,
-                'ingredients': [{'name': ing.name, 'quantity': ing.quantity} for ing in recipe.ingredients],
-                'instructions': recipe.instructions
-            }), 200
+            recipe = RecipeRepository.get_recipe_by_title(title, self.fields)
+            with request_metrics.timer('serialize'):
+                return json_response(serializer_for(self.fields).one(recipe)), 200
         except SQLAlchemyError as e:
             app.logger.error(f"Error fetching recipe: {str(e)}")
             return jsonify({'message': 'An error occurred while fetching the recipe'}), 500
@@ -64,81 +149,102 @@ class BaseRecipeView(MethodView):
             app.logger.error(f"Error: {str(e)}")
             return jsonify({'message': str(e)}), 500
 
-class CreateRecipeView(MethodView):
+class ExportRecipesView(MethodView):
+    def get(self):
+        export_format = request.args.get('format', 'ndjson', type=str)
+        search_query = request.args.get('search', '', type=str)
 
-    @jwt_required()
-    def post(self):
-        data = request.get_json()
-        required_fields = ['title', 'ingredients', 'instructions']
-        missing_fields = [field for field in required_fields if field not in data]
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({'message': f'Unsupported format: {export_format}'}), 400
 
-        if missing_fields:
-            return jsonify({'message': f'Missing fields: {", ".join(missing_fields)}'}), 400
+        chunks = export_recipes(export_format, search_query, app.config['RECIPE_EXPORT_CHUNK_SIZE'])
+        response = app.response_class(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[export_format])
+        response.headers['Content-Disposition'] = f'attachment; filename=recipes.{export_format}'
+        return response
 
-        current_user = get_jwt_identity()
-        user = User.query.filter_by(username=current_user['username']).first()
+class SuggestRecipesView(MethodView):
+    def get(self):
+        query = request.args.get('q', '', type=str)
+        limit = request.args.get('limit', app.config['SUGGEST_LIMIT'], type=int)
+        limit = max(1, min(limit, app.config['SUGGEST_MAX_LIMIT']))
 
         try:
-            new_recipe = RecipeRepository.create_recipe(data, user)
-            return jsonify({
-                'message': 'Recipe created successfully',
-                'recipe': {
-                    'id': new_recipe.id,
-                    'title': new_recipe.title,
-                    'description': new_recipe.description,
-                    'ingredients': [{'name': ing.name, 'quantity': ing.quantity} for ing in new_recipe.ingredients],
-                    'instructions': new_recipe.instructions,
-                    'created_by': new_recipe.author.username
-                }
-            }), 201
+            suggestions = suggest_index.suggest(query, limit)
+            return json_response({'query': query, 'suggestions': suggestions})
         except SQLAlchemyError as e:
-            app.logger.error(f"Error creating recipe: {str(e)}")
-            return jsonify({'message': 'An error occurred while creating the recipe'}), 500
-        except Exception as e:
-            app.logger.error(f"Error: {str(e)}")
-            return jsonify({'message': str(e)}), 500
+            app.logger.error(f"Error building suggestions: {str(e)}")
+            return jsonify({'message': 'An error occurred while fetching suggestions'}), 500
 
-class UpdateRecipeView(MethodView):
+class RecipeStatsView(MethodView):
+    def get(self):
+        limit = request.args.get('limit', app.config['STATS_TOP_LIMIT'], type=int)
+        limit = max(1, min(limit, app.config['STATS_MAX_LIMIT']))
 
-    @jwt_required()
-    def put(self, title):
-        data = request.get_json()
-        required_fields = ['title', 'ingredients', 'instructions']
-        missing_fields = [field for field in required_fields if field not in data]
+        try:
+            return json_response(catalog_stats.summary(limit))
+        except SQLAlchemyError as e:
+            app.logger.error(f"Error reading recipe stats: {str(e)}")
+            return jsonify({'message': 'An error occurred while fetching the recipe stats'}), 500
 
-        if missing_fields:
-            return jsonify({'message': f'Missing fields: {", ".join(missing_fields)}'}), 400
+class CreateRecipeView(MethodView):
 
-        current_user = get_jwt_identity()
-        user = User.query.filter_by(username=current_user['username']).first()
+    @identity_required
+    def post(self):
+        payload, status_code = operations.create_recipe(request.get_json(), current_identity)
+        return json_response(payload, status_code)
+
+class BatchRecipesView(MethodView):
+
+    @identity_required
+    def post(self):
+        data = request.get_json()
+        error = batch_errors(data, app.config['BATCH_MAX_OPERATIONS'])
+
+        if error:
+            return jsonify({'message': error}), 400
 
         try:
-            recipe, status_code = RecipeRepository.update_recipe(title, data, user)
-            if status_code == 403:
-                return jsonify({'message': 'You can only edit your own recipes'}), 403
-            return jsonify({'message': 'Recipe updated successfully'}), 200
+            report, status_code = run_batch(data['operations'], current_identity, data.get('mode', 'atomic'))
+            return json_response(report, status_code)
         except SQLAlchemyError as e:
-            app.logger.error(f"Error updating recipe: {str(e)}")
-            return jsonify({'message': 'An error occurred while updating the recipe'}), 500
+            app.logger.error(f"Error running recipe batch: {str(e)}")
+            return jsonify({'message': 'An error occurred while running the batch'}), 500
         except Exception as e:
             app.logger.error(f"Error: {str(e)}")
             return jsonify({'message': str(e)}), 500
 
-class DeleteRecipeView(MethodView):
+class ImportRecipesView(MethodView):
 
-    @jwt_required()
-    def delete(self, title):
-        current_user = get_jwt_identity()
-        user = User.query.filter_by(username=current_user['username']).first()
+    @identity_required
+    def post(self):
+        batch_size = request.args.get('batch_size', app.config['RECIPE_IMPORT_BATCH_SIZE'], type=int)
 
         try:
-            recipe, status_code = RecipeRepository.delete_recipe(title, user)
-            if status_code == 403:
-                return jsonify({'message': 'You can only delete your own recipes'}), 403
-            return jsonify({'message': 'Recipe deleted successfully'}), 200
+            rows = read_rows(request.stream, format_for_mimetype(request.mimetype), app.config['RECIPE_IMPORT_MAX_ELEMENT_SIZE'])
+            report = RecipeImporter(current_identity.id, batch_size).run(rows)
+            return jsonify(report), 200
         except SQLAlchemyError as e:
-            app.logger.error(f"Error deleting recipe: {str(e)}")
-            return jsonify({'message': 'An error occurred while deleting the recipe'}), 500
+            app.logger.error(f"Error importing recipes: {str(e)}")
+            return jsonify({'message': 'An error occurred while importing the recipes'}), 500
         except Exception as e:
             app.logger.error(f"Error: {str(e)}")
-            return jsonify({'message': str(e)}), 500
\ No newline at end of file
+            return jsonify({'message': str(e)}), 500
+
+class UpdateRecipeView(MethodView):
+
+    @identity_required
+    def put(self, title):
+        payload, status_code = operations.update_recipe(title, request.get_json(), current_identity)
+        return json_response(payload, status_code)
+
+    @identity_required
+    def patch(self, title):
+        payload, status_code = operations.patch_recipe(title, request.get_json(), current_identity)
+        return json_response(payload, status_code)
+
+class DeleteRecipeView(MethodView):
+
+    @identity_required
+    def delete(self, title):
+        payload, status_code = operations.delete_recipe(title, current_identity)
+        return json_response(payload, status_code)
@@ -0,0 +1,224 @@
+import re
+from flask import current_app
+from sqlalchemy import event, text, select, func, cast, column, table, literal_column, or_, and_, literal, Float
+from app import db
+from app.recipe.models import Recipe, Ingredient
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def parse_terms(search_query):
+    return [term.lower() for term in TERM_PATTERN.findall(search_query or '')]
+
+
+def search_document(recipe_id, title, description, ingredient_names):
+    return {
+        'recipe_id': recipe_id,
+        'title': title,
+        'description': description or '',
+        'ingredients': ' '.join(ingredient_names),
+    }
+
+
+class SearchBackend:
+    """Keeps a full-text representation of every recipe (title, description and
+    ingredient names) and turns a search string into a ranked match set.
+
+    ``match`` returns a subquery with ``recipe_id`` and ``score`` columns, higher
+    scores being more relevant. Every term is matched as a prefix and all terms
+    must match.
+    """
+
+    def create_schema(self, connection):
+        pass
+
+    def drop_schema(self, connection):
+        pass
+
+    def index_recipe(self, recipe_id, title, description, ingredient_names):
+        self.index_recipes([search_document(recipe_id, title, description, ingredient_names)])
+
+    def index_recipes(self, documents, replace=True):
+        pass
+
+    def remove_recipe(self, recipe_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def match(self, terms):
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    documents = table('recipe_search', column('recipe_id'), column('document'))
+
+    def create_schema(self, connection):
+        connection.execute(text(
+            'CREATE TABLE IF NOT EXISTS recipe_search ('
+            'recipe_id INTEGER PRIMARY KEY REFERENCES recipe (id) ON DELETE CASCADE, '
+            'document TSVECTOR NOT NULL)'
+        ))
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_recipe_search_document ON recipe_search USING GIN (document)'
+        ))
+
+    def drop_schema(self, connection):
+        connection.execute(text('DROP TABLE IF EXISTS recipe_search'))
+
+    def index_recipes(self, documents, replace=True):
+        db.session.execute(text(
+            'INSERT INTO recipe_search (recipe_id, document) VALUES (:recipe_id, '
+            "setweight(to_tsvector(CAST(:config AS regconfig), :title), 'A') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :description), 'B') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :ingredients), 'C')) "
+            'ON CONFLICT (recipe_id) DO UPDATE SET document = EXCLUDED.document'
+        ), [dict(document, config=current_app.config['SEARCH_TEXT_CONFIG']) for document in documents])
+
+    def remove_recipe(self, recipe_id):
+        db.session.execute(text('DELETE FROM recipe_search WHERE recipe_id = :recipe_id'), {'recipe_id': recipe_id})
+
+    def clear(self):
+        db.session.execute(text('DELETE FROM recipe_search'))
+
+    def match(self, terms):
+        from sqlalchemy.dialects.postgresql import REGCONFIG
+
+        tsquery = func.to_tsquery(
+            cast(current_app.config['SEARCH_TEXT_CONFIG'], REGCONFIG),
+            ' & '.join(f'{term}:*' for term in terms)
+        )
+        # ts_rank_cd returns real; as double precision the score survives the
+        # round trip through a cursor and compares equal to itself
+        return select(
+            self.documents.c.recipe_id,
+            cast(func.ts_rank_cd(self.documents.c.document, tsquery), Float(53)).label('score')
+        ).where(self.documents.c.document.op('@@')(tsquery)).subquery()
+
+
+class SqliteSearchBackend(SearchBackend):
+    # bm25() weights for the title, description and ingredients columns
+    bm25 = literal_column('bm25(recipe_fts, 10.0, 4.0, 1.0)')
+
+    def create_schema(self, connection):
+        connection.execute(text(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS recipe_fts USING fts5('
+            "title, description, ingredients, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+
+    def drop_schema(self, connection):
+        connection.execute(text('DROP TABLE IF EXISTS recipe_fts'))
+
+    def index_recipes(self, documents, replace=True):
+        if replace:
+            db.session.execute(
+                text('DELETE FROM recipe_fts WHERE rowid = :recipe_id'),
+                [{'recipe_id': document['recipe_id']} for document in documents]
+            )
+        db.session.execute(text(
+            'INSERT INTO recipe_fts (rowid, title, description, ingredients) '
+            'VALUES (:recipe_id, :title, :description, :ingredients)'
+        ), documents)
+
+    def remove_recipe(self, recipe_id):
+        db.session.execute(text('DELETE FROM recipe_fts WHERE rowid = :recipe_id'), {'recipe_id': recipe_id})
+
+    def clear(self):
+        db.session.execute(text('DELETE FROM recipe_fts'))
+
+    def match(self, terms):
+        fts_query = ' AND '.join(f'"{term}"*' for term in terms)
+        return select(
+            literal_column('rowid').label('recipe_id'),
+            (-self.bm25).label('score')
+        ).select_from(table('recipe_fts')).where(
+            literal_column('recipe_fts').op('MATCH')(fts_query)
+        ).subquery()
+
+
+class LikeSearchBackend(SearchBackend):
+    # Unindexed fallback for databases without a supported full-text engine.
+
+    def match(self, terms):
+        conditions = [
+            or_(
+                Recipe.title.ilike(f'%{term}%'),
+                Recipe.description.ilike(f'%{term}%'),
+                Recipe.ingredients.any(Ingredient.name.ilike(f'%{term}%'))
+            )
+            for term in terms
+        ]
+        return select(Recipe.id.label('recipe_id'), literal(0).label('score')).where(and_(*conditions)).subquery()
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+
+def backend_for(dialect_name):
+    return BACKENDS.get(dialect_name, LikeSearchBackend)()
+
+
+class RecipeSearchIndex:
+
+    @property
+    def backend(self):
+        return backend_for(db.engine.dialect.name)
+
+    def index_recipe(self, recipe_id, title, description, ingredient_names):
+        self.backend.index_recipe(recipe_id, title, description, ingredient_names)
+
+    def index_recipes(self, documents, replace=True):
+        # Bulk variant taking search_document() dicts; pass replace=False for
+        # recipes that are known to be new to skip removing stale entries.
+        if documents:
+            self.backend.index_recipes(documents, replace)
+
+    def remove_recipe(self, recipe_id):
+        self.backend.remove_recipe(recipe_id)
+
+    def match(self, search_query):
+        terms = parse_terms(search_query)
+        if not terms:
+            return None
+        return self.backend.match(terms)
+
+    def rebuild(self, batch_size=500):
+        backend = self.backend
+        backend.clear()
+        indexed = 0
+        last_id = 0
+        while True:
+            recipes = (
+                Recipe.query.options(db.selectinload(Recipe.ingredients))
+                .filter(Recipe.id > last_id)
+                .order_by(Recipe.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not recipes:
+                break
+            backend.index_recipes([
+                search_document(recipe.id, recipe.title, recipe.description, [ing.name for ing in recipe.ingredients])
+                for recipe in recipes
+            ], replace=False)
+            indexed += len(recipes)
+            last_id = recipes[-1].id
+        db.session.commit()
+        return indexed
+
+
+search_index = RecipeSearchIndex()
+
+
+@event.listens_for(db.metadata, 'after_create')
+def create_search_schema(target, connection, **kw):
+    backend_for(connection.dialect.name).create_schema(connection)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def drop_search_schema(target, connection, **kw):
+    backend_for(connection.dialect.name).drop_schema(connection)
@@ -0,0 +1,71 @@
+import json
+from functools import lru_cache
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+RECIPE_FIELDS = ('id', 'title', 'description', 'ingredients', 'instructions')
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+def serialize_ingredients(recipe):
+    return [{'name': ing.name, 'quantity': ing.quantity} for ing in recipe.ingredients]
+
+
+GETTERS = {
+    'id': lambda recipe: recipe.id,
+    'title': lambda recipe: recipe.title,
+    'description': lambda recipe: recipe.description,
+    'ingredients': serialize_ingredients,
+    'instructions': lambda recipe: recipe.instructions,
+}
+
+
+@lru_cache(maxsize=64)
+def parse_fields(value):
+    # "fields=title,id" -> ('id', 'title'); fields keep the canonical order so
+    # equivalent requests share cache entries and ETags.
+    if not value:
+        return RECIPE_FIELDS
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(RECIPE_FIELDS)
+    if unknown:
+        raise InvalidFields(f'Unknown fields: {", ".join(sorted(unknown))}')
+    return tuple(name for name in RECIPE_FIELDS if name in requested) or RECIPE_FIELDS
+
+
+class RecipeSerializer:
+    # Resolves the getters for a fieldset once; serializers are shared per
+    # fieldset through serializer_for().
+
+    def __init__(self, fields=RECIPE_FIELDS):
+        self.fields = fields
+        self.getters = tuple((name, GETTERS[name]) for name in fields)
+
+    def one(self, recipe):
+        return {name: get(recipe) for name, get in self.getters}
+
+    def many(self, recipes):
+        getters = self.getters
+        return [{name: get(recipe) for name, get in getters} for recipe in recipes]
+
+
+@lru_cache(maxsize=64)
+def serializer_for(fields=RECIPE_FIELDS):
+    return RecipeSerializer(fields)
@@ -0,0 +1,147 @@
+from sqlalchemy import select, insert, delete, update, func
+from app import db
+from app.auth.models import User
+from app.replicas import reads_from_replica
+from app.recipe.models import Recipe, Ingredient, IngredientName, AuthorStats, IngredientStats, CatalogTotals, recipe_ingredient
+
+TOTALS_ID = 1
+
+
+def becoming_nonzero(deltas, counts):
+    # Keys whose count moved between zero and non-zero, as a net delta
+    return sum(
+        1 if delta > 0 and counts[key] == delta else -1 if delta < 0 and counts[key] == 0 else 0
+        for key, delta in deltas.items()
+    )
+
+
+class CatalogStats:
+    """Counters for /recipes/stats: recipes per author, recipes per ingredient
+    and catalog totals.
+
+    Writers add their deltas with ``record()`` inside their own transaction,
+    so the counters commit or roll back with the rows they count, and reading
+    them is a few primary key and index lookups whatever the catalog size.
+    Every ``record()`` also bumps the catalog version that the /recipes list
+    ETag is derived from, including writes that leave the counts unchanged.
+    ``rebuild()`` recomputes everything from the recipe tables.
+    """
+
+    def _upsert(self, model, key, values, columns):
+        # Adds values[...][column] to the stored counts and returns the new rows
+        dialect = db.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            statement = upsert(model)
+            statement = statement.on_conflict_do_update(
+                index_elements=[key],
+                set_={column: getattr(model, column) + getattr(statement.excluded, column) for column in columns}
+            ).returning(getattr(model, key), *(getattr(model, column) for column in columns))
+            return db.session.execute(statement, values).all()
+
+        rows = []
+        for value in values:
+            where = getattr(model, key) == value[key]
+            changed = db.session.execute(
+                update(model).where(where).values({column: getattr(model, column) + value[column] for column in columns})
+            ).rowcount
+            if not changed:
+                db.session.execute(insert(model), value)
+            rows.append(db.session.execute(
+                select(getattr(model, key), *(getattr(model, column) for column in columns)).where(where)
+            ).one())
+        return rows
+
+    def _add_counts(self, model, key, deltas):
+        deltas = {item: delta for item, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        rows = self._upsert(model, key, [{key: item, 'recipes': delta} for item, delta in sorted(deltas.items())], ['recipes'])
+        return becoming_nonzero(deltas, dict(rows))
+
+    def record(self, recipes=0, ingredients=0, authors=None, usage=None):
+        # authors maps user ids and usage ingredient name ids to recipe deltas
+        totals = {
+            'version': 1,
+            'recipes': recipes,
+            'ingredients': ingredients,
+            'authors': self._add_counts(AuthorStats, 'user_id', authors or {}),
+            'distinct_ingredients': self._add_counts(IngredientStats, 'ingredient_id', usage or {}),
+        }
+        self._upsert(CatalogTotals, 'id', [dict(totals, id=TOTALS_ID)], list(totals))
+
+    def recipes_added(self, user_id, ingredient_rows, usage, recipes=1):
+        self.record(recipes=recipes, ingredients=ingredient_rows, authors={user_id: recipes}, usage=usage)
+
+    def recipe_removed(self, user_id, ingredient_rows, usage):
+        self.record(recipes=-1, ingredients=-ingredient_rows, authors={user_id: -1}, usage=usage)
+
+    @reads_from_replica
+    def summary(self, limit):
+        totals = db.session.get(CatalogTotals, TOTALS_ID)
+        recipes = totals.recipes if totals else 0
+        authors = totals.authors if totals else 0
+        ingredients = totals.ingredients if totals else 0
+
+        top_authors = db.session.execute(
+            select(User.username, AuthorStats.recipes)
+            .join(User, User.id == AuthorStats.user_id)
+            .where(AuthorStats.recipes > 0)
+            .order_by(AuthorStats.recipes.desc(), AuthorStats.user_id)
+            .limit(limit)
+        ).all()
+        top_ingredients = db.session.execute(
+            select(IngredientName.name, IngredientStats.recipes)
+            .join(IngredientName, IngredientName.id == IngredientStats.ingredient_id)
+            .where(IngredientStats.recipes > 0)
+            .order_by(IngredientStats.recipes.desc(), IngredientStats.ingredient_id)
+            .limit(limit)
+        ).all()
+
+        return {
+            'recipes': recipes,
+            'authors': authors,
+            'ingredients': ingredients,
+            'distinct_ingredients': totals.distinct_ingredients if totals else 0,
+            'average_ingredients_per_recipe': round(ingredients / recipes, 2) if recipes else 0,
+            'average_recipes_per_author': round(recipes / authors, 2) if authors else 0,
+            'top_authors': [{'username': username, 'recipes': count} for username, count in top_authors],
+            'top_ingredients': [{'name': name, 'recipes': count} for name, count in top_ingredients],
+        }
+
+    @reads_from_replica
+    def version(self):
+        return db.session.execute(select(CatalogTotals.version).where(CatalogTotals.id == TOTALS_ID)).scalar() or 0
+
+    def rebuild(self):
+        # The version keeps counting up so list ETags issued before stay invalid
+        version = db.session.execute(select(CatalogTotals.version).where(CatalogTotals.id == TOTALS_ID)).scalar() or 0
+        db.session.execute(delete(AuthorStats))
+        db.session.execute(delete(IngredientStats))
+        db.session.execute(delete(CatalogTotals))
+
+        db.session.execute(insert(AuthorStats).from_select(
+            ['user_id', 'recipes'],
+            select(Recipe.created_by, func.count(Recipe.id)).group_by(Recipe.created_by)
+        ))
+        db.session.execute(insert(IngredientStats).from_select(
+            ['ingredient_id', 'recipes'],
+            select(recipe_ingredient.c.ingredient_id, func.count()).group_by(recipe_ingredient.c.ingredient_id)
+        ))
+        totals = {
+            'id': TOTALS_ID,
+            'version': version + 1,
+            'recipes': db.session.execute(select(func.count(Recipe.id))).scalar(),
+            'ingredients': db.session.execute(select(func.count(Ingredient.id))).scalar(),
+            'authors': db.session.execute(select(func.count()).select_from(AuthorStats)).scalar(),
+            'distinct_ingredients': db.session.execute(select(func.count()).select_from(IngredientStats)).scalar(),
+        }
+        db.session.execute(insert(CatalogTotals), totals)
+        db.session.commit()
+        return totals
+
+
+catalog_stats = CatalogStats()
@@ -0,0 +1,253 @@
+import bisect
+import heapq
+import sys
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select, func
+from app import db
+from app.recipe.catalog import canonical_name
+from app.recipe.models import Recipe, IngredientName, recipe_ingredient
+
+TITLE = 'title'
+INGREDIENT = 'ingredient'
+MAX_CACHED_PREFIXES = 4096
+
+
+def word_suffixes(key):
+    # "miso soup" is found by "mi" and by "so"
+    words = key.split(' ')
+    return {' '.join(words[start:]) for start in range(len(words))}
+
+
+class SuggestIndex:
+    """In-memory typeahead over recipe titles and canonical ingredient names.
+
+    ``keys`` is a sorted array of ``(suffix, kind, key)`` tuples, so a prefix
+    lookup is a binary search followed by a scan of the matching range.
+    Popularity is the number of recipes with a title or using an ingredient.
+    The index is built from the database on a background thread when a worker
+    starts, kept current by the repository after each commit, and rebuilt in
+    the background every SUGGEST_REFRESH_SECONDS to pick up writes made by
+    other processes; lookups keep using the current index meanwhile. Only one
+    build runs at a time, and requests arriving before the first build has
+    finished wait for it instead of starting their own. Writes applied while
+    a build reads the database are queued and replayed onto the new index.
+
+    Results are memoized per prefix; a write only drops the prefixes of the
+    keys it touched, so short, busy prefixes stay cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._pending = None
+        self.refresh_seconds = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.entries = {}
+            self.keys = []
+            self.results = {}
+            self.result_hits = 0
+            self.result_misses = 0
+            self.built_at = None
+            self.build_seconds = None
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config['SUGGEST_REFRESH_SECONDS']
+        self.reset()
+        app.extensions['suggest_index'] = self
+
+    @property
+    def built(self):
+        return self.built_at is not None
+
+    def is_stale(self):
+        if not self.built:
+            return True
+        return bool(self.refresh_seconds) and time.monotonic() - self.built_at > self.refresh_seconds
+
+    def build(self):
+        with self._build_lock:
+            self._build()
+
+    def ensure_built(self):
+        with self._build_lock:
+            if not self.built:
+                self._build()
+
+    def refresh_in_background(self, app):
+        # Returns the build thread, or None when a build is already running
+        if not self._build_lock.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                with app.app_context():
+                    self._build()
+            except Exception:
+                app.logger.exception('Building the suggest index failed')
+            finally:
+                self._build_lock.release()
+
+        thread = threading.Thread(target=run, name='suggest-index-build', daemon=True)
+        thread.start()
+        return thread
+
+    def _build(self):
+        started = time.monotonic()
+        # A write committed just before the snapshot but applied after this
+        # point is counted twice until the next build; without the queue,
+        # writes landing during the build would be lost until then.
+        with self._lock:
+            self._pending = []
+        try:
+            entries, keys = self._read()
+            with self._lock:
+                self.entries = entries
+                self.keys = keys
+                self.results = {}
+                for added, removed in self._pending:
+                    self._apply(added, removed)
+                self.built_at = time.monotonic()
+                self.build_seconds = self.built_at - started
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _read(self):
+        titles = db.session.execute(select(Recipe.title, func.count()).group_by(Recipe.title)).all()
+        ingredients = db.session.execute(
+            select(IngredientName.name, func.count())
+            .join(recipe_ingredient, recipe_ingredient.c.ingredient_id == IngredientName.id)
+            .group_by(IngredientName.name)
+        ).all()
+
+        entries = {}
+        for kind, rows in ((TITLE, titles), (INGREDIENT, ingredients)):
+            for label, count in rows:
+                key = canonical_name(label)
+                entry = entries.setdefault((kind, key), [label, 0])
+                entry[1] += count
+        keys = sorted((suffix, kind, key) for kind, key in entries for suffix in word_suffixes(key))
+        return entries, keys
+
+    def _forget_results(self, key):
+        for suffix in word_suffixes(key):
+            for end in range(1, len(suffix) + 1):
+                self.results.pop(suffix[:end], None)
+
+    def _update(self, kind, label, delta):
+        key = canonical_name(label)
+        if not key:
+            return
+        self._forget_results(key)
+        entry = self.entries.get((kind, key))
+        if entry is None:
+            if delta <= 0:
+                return
+            self.entries[(kind, key)] = [label, delta]
+            for suffix in word_suffixes(key):
+                bisect.insort(self.keys, (suffix, kind, key))
+        else:
+            entry[1] += delta
+            if entry[1] <= 0:
+                del self.entries[(kind, key)]
+                for suffix in word_suffixes(key):
+                    index = bisect.bisect_left(self.keys, (suffix, kind, key))
+                    if index < len(self.keys) and self.keys[index] == (suffix, kind, key):
+                        del self.keys[index]
+
+    def apply(self, added=(), removed=()):
+        # added/removed are (title, ingredient names) pairs of committed
+        # recipes. Before the first build there is nothing to update, but a
+        # running build replays them.
+        added, removed = list(added), list(removed)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((added, removed))
+            if self.built:
+                self._apply(added, removed)
+
+    def _apply(self, added, removed):
+        for delta, recipes in ((1, added), (-1, removed)):
+            for title, names in recipes:
+                self._update(TITLE, title, delta)
+                for name in {canonical_name(name) for name in names}:
+                    self._update(INGREDIENT, name, delta)
+
+    def recipe_added(self, title, names):
+        self.apply(added=[(title, names)])
+
+    def recipe_removed(self, title, names):
+        self.apply(removed=[(title, names)])
+
+    def recipe_changed(self, old_title, old_names, title, names):
+        self.apply(added=[(title, names)], removed=[(old_title, old_names)])
+
+    def suggest(self, query, limit=10):
+        prefix = canonical_name(query)
+        if not prefix:
+            return []
+        if not self.built:
+            self.ensure_built()
+        elif self.is_stale():
+            self.refresh_in_background(current_app._get_current_object())
+
+        with self._lock:
+            cached = self.results.get(prefix)
+            if cached is not None and limit in cached:
+                self.result_hits += 1
+                return cached[limit]
+            self.result_misses += 1
+
+            # Most popular first; titles and names that start with the prefix
+            # rank ahead of those matching on a later word.
+            entries = self.entries
+            keys = self.keys
+            ranked = set()
+            for index in range(bisect.bisect_left(keys, (prefix,)), len(keys)):
+                suffix, kind, key = keys[index]
+                if not suffix.startswith(prefix):
+                    break
+                ranked.add((-entries[(kind, key)][1], suffix != key, len(key), key, kind))
+
+            suggestions = []
+            for count, _, _, key, kind in heapq.nsmallest(limit, ranked):
+                suggestions.append({'text': entries[(kind, key)][0], 'type': kind, 'count': -count})
+
+            if len(self.results) >= MAX_CACHED_PREFIXES:
+                self.results = {}
+            self.results.setdefault(prefix, {})[limit] = suggestions
+            return suggestions
+
+    def memory_bytes(self):
+        # Approximate: containers, tuples and the strings they own.
+        with self._lock:
+            size = sys.getsizeof(self.keys) + sys.getsizeof(self.entries)
+            size += sum(sys.getsizeof(item) + sys.getsizeof(item[0]) for item in self.keys)
+            size += sum(
+                sys.getsizeof(key) + sys.getsizeof(key[1]) + sys.getsizeof(entry) + sys.getsizeof(entry[0])
+                for key, entry in self.entries.items()
+            )
+            return size
+
+    def stats(self):
+        stats = {
+            'built': int(self.built),
+            'building': int(self._build_lock.locked()),
+            'entries': len(self.entries),
+            'keys': len(self.keys),
+            'memory_bytes': self.memory_bytes(),
+            'cached_prefixes': len(self.results),
+            'result_hits': self.result_hits,
+            'result_misses': self.result_misses,
+        }
+        if self.build_seconds is not None:
+            stats['build_seconds'] = round(self.build_seconds, 6)
+        return stats
+
+
+suggest_index = SuggestIndex()
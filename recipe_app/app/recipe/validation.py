@@ -0,0 +1,30 @@
+REQUIRED_FIELDS = ['title', 'ingredients', 'instructions']
+
+
+def missing_fields(data):
+    return [field for field in REQUIRED_FIELDS if field not in data]
+
+PATCHABLE_FIELDS = ['title', 'description', 'instructions', 'ingredients', 'ingredient_changes']
+
+
+def patch_errors(data):
+    if not isinstance(data, dict) or not data:
+        return 'Nothing to update'
+    unknown = [field for field in data if field not in PATCHABLE_FIELDS]
+    if unknown:
+        return f'Unknown fields: {", ".join(unknown)}'
+    if 'title' in data and not data['title']:
+        return 'Title cannot be empty'
+    if 'ingredients' in data and 'ingredient_changes' in data:
+        return 'Send either ingredients or ingredient_changes, not both'
+
+    changes = data.get('ingredient_changes', {})
+    if not isinstance(changes, dict) or any(key not in ('set', 'remove') for key in changes):
+        return 'ingredient_changes accepts only set and remove'
+    if not isinstance(changes.get('set', []), list) or not isinstance(changes.get('remove', []), list):
+        return 'ingredient_changes set and remove must be lists'
+    if any(not isinstance(ing, dict) or not isinstance(ing.get('name'), str) for ing in changes.get('set', [])):
+        return 'Each ingredient needs a name'
+    if any(not isinstance(name, str) for name in changes.get('remove', [])):
+        return 'ingredient_changes remove takes ingredient names'
+    return None
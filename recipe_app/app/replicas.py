@@ -0,0 +1,81 @@
+import random
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_PREFIX = 'replica'
+READ_FROM_REPLICA = 'read_from_replica'
+PINNED_TO_PRIMARY = 'pinned_to_primary'
+REPLICA_KEY = 'replica_key'
+
+
+class RoutingSession(Session):
+    """Session that sends reads made inside ``replica_reads()`` to a replica bind.
+
+    Replicas are the ``SQLALCHEMY_BINDS`` whose key starts with "replica"; one is
+    picked per session, so a request sees a single replica. Once the session has
+    written anything (a flush or a DML statement) it is pinned to the primary
+    until it is removed at the end of the request, so reads after a write see
+    that write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(READ_FROM_REPLICA) and not self.info.get(PINNED_TO_PRIMARY):
+            engine = self.replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def replica_engine(self):
+        engines = self._db.engines
+        if REPLICA_KEY not in self.info:
+            keys = [key for key in engines if key and key.startswith(REPLICA_PREFIX)]
+            self.info[REPLICA_KEY] = random.choice(keys) if keys else None
+        key = self.info[REPLICA_KEY]
+        return engines[key] if key is not None else None
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def pin_after_flush(session, flush_context):
+    session.info[PINNED_TO_PRIMARY] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def pin_after_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[PINNED_TO_PRIMARY] = True
+
+
+@contextmanager
+def replica_reads():
+    from app import db
+
+    session = db.session()
+    previous = session.info.get(READ_FROM_REPLICA, False)
+    session.info[READ_FROM_REPLICA] = True
+    try:
+        yield
+    finally:
+        session.info[READ_FROM_REPLICA] = previous
+
+
+def reads_from_replica(method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def pool_stats():
+    stats = {}
+    for key, engine in current_app.extensions['sqlalchemy'].engines.items():
+        name = key or 'primary'
+        for metric in ('size', 'checkedin', 'checkedout', 'overflow'):
+            # Only queue-style pools report these
+            value = getattr(engine.pool, metric, None)
+            if callable(value):
+                stats[f'{name}_{metric}'] = value()
+    return stats
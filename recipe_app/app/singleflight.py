@@ -0,0 +1,77 @@
+import threading
+
+
+class FlightTimeout(Exception):
+    pass
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiting')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiting = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key
+    wait for that call and get its result (or its exception).
+
+    Nothing is kept once a call finishes, so callers arriving after it get a
+    fresh call; this only collapses calls that actually overlap.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, timeout=None):
+        # Returns (result, shared); shared is True when another caller ran fn
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiting += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+
+        finished = call.done.wait(timeout)
+        with self._lock:
+            call.waiting -= 1
+            if finished:
+                self.shared += 1
+            else:
+                self.timeouts += 1
+        if not finished:
+            raise FlightTimeout(key)
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'shared': self.shared,
+                'timeouts': self.timeouts,
+                'in_flight': len(self._calls),
+                'waiting': sum(call.waiting for call in self._calls.values()),
+            }
@@ -0,0 +1,117 @@
+import pytest
+from starlette.testclient import TestClient
+from app import db
+from app.asgi import async_database_url, create_asgi_app
+
+@pytest.fixture(scope='module')
+def clients(tmp_path_factory):
+    database = tmp_path_factory.mktemp('asgi') / 'recipes.db'
+    asgi_app = create_asgi_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'RECIPE_CACHE_ENABLED': False,
+        'BCRYPT_ROUNDS': 4,
+    })
+    flask_app = asgi_app.state.flask_app
+
+    with flask_app.app_context():
+        db.create_all()
+
+    with TestClient(asgi_app) as client:
+        yield client, flask_app.test_client()
+
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+def login(client, username):
+    client.post('/register', json={'username': username, 'password': 'asyncpassword'})
+    response = client.post('/login', json={'username': username, 'password': 'asyncpassword'})
+    assert response.status_code == 200
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+def recipe(title, *names):
+    return {
+        "title": title,
+        "description": "Served async.",
+        "ingredients": [{"name": name, "quantity": "1"} for name in names],
+        "instructions": "Await."
+    }
+
+def test_async_database_url():
+    assert async_database_url('postgresql://u:p@db:5432/recipes').drivername == 'postgresql+asyncpg'
+    assert async_database_url('sqlite:////tmp/x.db').drivername == 'sqlite+aiosqlite'
+
+def test_auth_and_tokens_work_across_apps(clients):
+    client, flask_client = clients
+    headers = login(client, 'asyncuser')
+
+    assert flask_client.post('/recipes', headers=headers, json=recipe('Flask Made', 'flour')).status_code == 201
+    token = flask_client.post('/login', json={'username': 'asyncuser', 'password': 'asyncpassword'}).get_json()['access_token']
+    flask_headers = {'Authorization': f'Bearer {token}'}
+    assert client.delete('/recipes/Flask Made', headers=flask_headers).status_code == 200
+
+    assert client.post('/login', json={'username': 'asyncuser', 'password': 'wrong'}).status_code == 401
+    assert client.post('/recipes', json=recipe('No Token')).status_code == 401
+    assert client.post('/recipes', headers={'Authorization': 'Bearer nonsense'}, json=recipe('Bad Token')).status_code == 422
+
+def test_async_reads_match_the_flask_app(clients):
+    client, flask_client = clients
+    headers = login(client, 'asyncreader')
+    for number in range(5):
+        response = client.post('/recipes', headers=headers, json=recipe(f'Async Dish {number}', 'rice', f'spice{number}'))
+        assert response.status_code == 201
+
+    for args in (
+        {'page': 2, 'per_page': 2},
+        {'cursor': '', 'per_page': 2, 'total': 'exact'},
+        {'search': 'dish', 'fields': 'title,ingredients'},
+        {'with': 'rice', 'without': 'spice1'},
+    ):
+        response = client.get('/recipes', params=args)
+        expected = flask_client.get('/recipes', query_string=args)
+        assert response.status_code == 200
+        assert response.json() == expected.get_json()
+        assert response.headers['ETag'] == expected.headers['ETag']
+
+    cursor = client.get('/recipes', params={'cursor': '', 'per_page': 2}).json()['meta']['next_cursor']
+    assert [r['title'] for r in client.get('/recipes', params={'cursor': cursor, 'per_page': 2}).json()['recipes']] == ['Async Dish 2', 'Async Dish 3']
+    assert client.get('/recipes', params={'cursor': 'garbage'}).status_code == 400
+    assert client.get('/recipes', params={'fields': 'calories'}).status_code == 400
+
+    response = client.get('/recipes/Async Dish 1')
+    assert response.json() == flask_client.get('/recipes/Async Dish 1').get_json()
+    assert client.get('/recipes/Async Dish 1', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get('/recipes/Nothing Here').status_code == 404
+
+def test_async_writes(clients):
+    client, flask_client = clients
+    headers = login(client, 'asyncwriter')
+    assert client.post('/recipes', headers=headers, json={'title': 'Incomplete'}).status_code == 400
+    assert client.post('/recipes', headers=headers, json=recipe('Async Stew', 'beans')).status_code == 201
+
+    response = client.patch('/recipes/Async Stew', headers=headers, json={'ingredient_changes': {'set': [{'name': 'leeks'}]}})
+    assert response.status_code == 200
+    assert client.get('/recipes', params={'with': 'leeks', 'fields': 'title'}).json()['recipes'] == [{'title': 'Async Stew'}]
+
+    other = login(client, 'asyncother')
+    assert client.put('/recipes/Async Stew', headers=other, json=recipe('Taken')).status_code == 403
+    assert client.delete('/recipes/Async Stew', headers=headers).status_code == 200
+    assert client.delete('/recipes/Async Stew', headers=headers).status_code == 404
+    assert flask_client.get('/recipes/Async Stew').status_code == 404
+
+def test_flask_only_endpoints_are_not_taken_for_titles(clients):
+    client, flask_client = clients
+    headers = login(client, 'asyncbatcher')
+    response = client.post('/recipes/batch', headers=headers, json={'operations': [
+        {'op': 'create', 'data': recipe('Batched Bowl', 'rice')}
+    ]})
+    assert response.status_code == 200
+    assert client.get('/recipes/Batched Bowl').status_code == 200
+
+    response = client.get('/recipes/stats')
+    assert response.status_code == 200
+    assert response.json() == flask_client.get('/recipes/stats').get_json()
+    assert client.get('/recipes/suggest', params={'q': 'batch'}).json()['suggestions'][0]['text'] == 'Batched Bowl'
+    assert 'Batched Bowl' in client.get('/recipes/export').text
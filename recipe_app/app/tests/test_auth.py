@@ -0,0 +1,67 @@
+import threading
+import bcrypt
+import pytest
+from flask import Flask
+from app import create_app, db
+from app.auth.models import User
+from app.auth.passwords import PasswordHasher, HasherBusy, password_hasher
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+    flask_app.config['BCRYPT_ROUNDS'] = 5
+    password_hasher.init_app(flask_app)
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+
+        yield testing_client
+
+        db.session.remove()
+        db.drop_all()
+
+def test_register_uses_configured_cost(test_client):
+    response = test_client.post('/register', json={'username': 'alice', 'password': 'wonderland'})
+    assert response.status_code == 201
+    assert User.query.filter_by(username='alice').one().password.startswith('$2b$05$')
+
+    assert test_client.post('/login', json={'username': 'alice', 'password': 'wonderland'}).status_code == 200
+    assert test_client.post('/login', json={'username': 'alice', 'password': 'rabbit'}).status_code == 401
+
+def test_login_rehashes_outdated_cost(test_client):
+    old_hash = bcrypt.hashpw(b'looking-glass', bcrypt.gensalt(4)).decode('utf-8')
+    db.session.add(User(username='bob', password=old_hash))
+    db.session.commit()
+
+    assert test_client.post('/login', json={'username': 'bob', 'password': 'looking-glass'}).status_code == 200
+    new_hash = User.query.filter_by(username='bob').one().password
+    assert new_hash.startswith('$2b$05$')
+    assert test_client.post('/login', json={'username': 'bob', 'password': 'looking-glass'}).status_code == 200
+
+def test_plaintext_passwords_never_match(test_client):
+    db.session.add(User(username='carol', password='not-a-hash'))
+    db.session.commit()
+    assert test_client.post('/login', json={'username': 'carol', 'password': 'not-a-hash'}).status_code == 401
+
+def test_hasher_rejects_work_beyond_pending_limit():
+    app = Flask(__name__)
+    app.config.update(BCRYPT_ROUNDS=4, BCRYPT_WORKERS=1, BCRYPT_MAX_PENDING=0, BCRYPT_TIMEOUT=5)
+    hasher = PasswordHasher()
+    hasher.init_app(app)
+
+    release = threading.Event()
+    started = threading.Event()
+    def slow():
+        started.set()
+        release.wait()
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    started.wait()
+    with pytest.raises(HasherBusy):
+        hasher.hash('password')
+    release.set()
+    worker.join()
+    assert hasher.verify('password', hasher.hash('password'))
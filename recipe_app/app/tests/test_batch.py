@@ -0,0 +1,112 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.models import Recipe
+
+@pytest.fixture(scope='module')
+def test_app():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    with flask_app.app_context():
+        db.create_all()
+        owner = User(username='batchuser', password='batchpassword')
+        other = User(username='otheruser', password='otherpassword')
+        db.session.add_all([owner, other])
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity={"id": owner.id, "username": "batchuser"})}'}
+        other_headers = {'Authorization': f'Bearer {create_access_token(identity={"id": other.id, "username": "otheruser"})}'}
+        flask_app.test_client().post('/recipes', headers=other_headers, json=recipe('Not Yours'))
+
+        yield flask_app, headers
+
+        db.session.remove()
+        db.drop_all()
+
+def recipe(title, **fields):
+    return dict({
+        "title": title,
+        "description": "Batch test.",
+        "ingredients": [{"name": "rice", "quantity": "200 g"}],
+        "instructions": "Cook."
+    }, **fields)
+
+def statuses(response):
+    return [result['status'] for result in response.get_json()['results']]
+
+def titles():
+    return [r.title for r in Recipe.query.order_by(Recipe.id)]
+
+def test_atomic_batch_commits_all_operations(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    client.get('/recipes')
+    response = client.post('/recipes/batch', headers=headers, json={'operations': [
+        {'op': 'create', 'data': recipe('Monday')},
+        {'op': 'create', 'data': recipe('Tuesday')},
+        {'op': 'update', 'title': 'Monday', 'data': recipe('Monday', description='Updated.')},
+        {'op': 'patch', 'title': 'Tuesday', 'data': {'instructions': 'Steam.'}},
+        {'op': 'delete', 'title': 'Tuesday'},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()['committed'] is True
+    assert statuses(response) == [201, 201, 200, 200, 200]
+    assert response.get_json()['results'][0]['body']['recipe']['created_by'] == 'batchuser'
+    assert titles() == ['Not Yours', 'Monday']
+
+    listing = client.get('/recipes')
+    assert listing.headers['X-Cache'] == 'MISS'
+    assert [r['description'] for r in listing.get_json()['recipes']] == ['Batch test.', 'Updated.']
+
+def test_atomic_batch_rolls_back_on_first_failure(test_app):
+    flask_app, headers = test_app
+    response = flask_app.test_client().post('/recipes/batch', headers=headers, json={'operations': [
+        {'op': 'create', 'data': recipe('Wednesday')},
+        {'op': 'delete', 'title': 'Nobody Made This'},
+        {'op': 'create', 'data': recipe('Thursday')},
+    ]})
+    assert response.status_code == 404
+    assert response.get_json()['committed'] is False
+    assert statuses(response) == [201, 404, 424]
+    assert titles() == ['Not Yours', 'Monday']
+
+def test_continue_mode_keeps_successful_operations(test_app):
+    flask_app, headers = test_app
+    response = flask_app.test_client().post('/recipes/batch', headers=headers, json={'mode': 'continue', 'operations': [
+        {'op': 'create', 'data': recipe('Friday')},
+        {'op': 'create', 'data': {'title': 'Incomplete'}},
+        {'op': 'update', 'title': 'Not Yours', 'data': recipe('Mine Now')},
+        {'op': 'patch', 'title': 'Friday', 'data': {'ingredients': [{'name': 'noodles'}]}},
+        {'op': 'bake', 'title': 'Friday'},
+    ]})
+    assert response.status_code == 200
+    assert statuses(response) == [201, 400, 403, 200, 400]
+    assert titles() == ['Not Yours', 'Monday', 'Friday']
+    assert [ing.name for ing in Recipe.query.filter_by(title='Friday').one().ingredients] == ['noodles']
+
+def test_batch_statuses_match_individual_requests(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    singles = [
+        client.put('/recipes/Not%20Yours', headers=headers, json=recipe('Not Yours')),
+        client.patch('/recipes/Missing', headers=headers, json={'description': 'x'}),
+        client.post('/recipes', headers=headers, json={'title': 'Incomplete'}),
+        client.delete('/recipes/Not%20Yours', headers=headers),
+    ]
+    batched = client.post('/recipes/batch', headers=headers, json={'mode': 'continue', 'operations': [
+        {'op': 'update', 'title': 'Not Yours', 'data': recipe('Not Yours')},
+        {'op': 'patch', 'title': 'Missing', 'data': {'description': 'x'}},
+        {'op': 'create', 'data': {'title': 'Incomplete'}},
+        {'op': 'delete', 'title': 'Not Yours'},
+    ]}).get_json()['results']
+    assert [single.status_code for single in singles] == [403, 404, 400, 403]
+    assert [(r['status'], r['body']) for r in batched] == [(single.status_code, single.get_json()) for single in singles]
+
+def test_invalid_batches_are_rejected(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    assert client.post('/recipes/batch', headers=headers, json=[]).status_code == 400
+    assert client.post('/recipes/batch', headers=headers, json={'operations': []}).status_code == 400
+    assert client.post('/recipes/batch', headers=headers, json={'mode': 'eventually', 'operations': [{}]}).status_code == 400
+    assert client.post('/recipes/batch', json={'operations': [{}]}).status_code == 401
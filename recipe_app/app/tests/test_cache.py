@@ -0,0 +1,100 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.cache import LRUCache
+from app.recipe.model_repos.recipe_repo import RecipeRepository
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='cacheuser', password='cachepassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'cacheuser'})
+
+        yield testing_client, token
+
+        db.session.remove()
+        db.drop_all()
+
+RECIPE = {
+    "title": "Lemon Tart",
+    "description": "Sharp and sweet.",
+    "ingredients": [{"name": "lemons", "quantity": "4"}, {"name": "sugar", "quantity": "150 g"}],
+    "instructions": "Bake the shell, fill and set."
+}
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, default_ttl=0)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['hits'] == 3
+    assert cache.stats()['misses'] == 1
+
+def test_lru_cache_expires_entries():
+    now = [100.0]
+    cache = LRUCache(max_entries=10, default_ttl=5, clock=lambda: now[0])
+    cache.set('a', 1)
+    now[0] += 4
+    assert cache.get('a') == 1
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+def test_recipe_reads_are_cached_until_written(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/recipes', headers=headers, json=RECIPE)
+
+    assert client.get('/recipes/Lemon%20Tart').headers['X-Cache'] == 'MISS'
+    assert client.get('/recipes/Lemon%20Tart').headers['X-Cache'] == 'HIT'
+    assert client.get('/recipes').headers['X-Cache'] == 'MISS'
+    assert client.get('/recipes').headers['X-Cache'] == 'HIT'
+    assert client.get('/recipes', query_string={'per_page': 5}).headers['X-Cache'] == 'MISS'
+
+    client.put('/recipes/Lemon%20Tart', headers=headers, json={**RECIPE, "description": "Sharper."})
+    response = client.get('/recipes/Lemon%20Tart')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['description'] == 'Sharper.'
+    response = client.get('/recipes')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['recipes'][0]['description'] == 'Sharper.'
+
+def test_missing_recipes_are_not_cached(test_client):
+    client, token = test_client
+    client.get('/recipes/Nothing%20Here')
+    response = client.get('/recipes/Nothing%20Here')
+    assert response.status_code == 404
+    assert 'X-Cache' not in response.headers
+
+def test_writes_from_other_processes_are_not_served_stale(test_client):
+    client, token = test_client
+    assert client.get('/recipes/Lemon%20Tart').headers['X-Cache'] in ('HIT', 'MISS')
+    assert client.get('/recipes').headers['X-Cache'] == 'HIT'
+
+    # Another worker commits an update; this process's cache tokens stay as they were
+    user = User.query.filter_by(username='cacheuser').one()
+    recipe, _ = RecipeRepository.patch_recipe('Lemon Tart', {'instructions': 'Chill overnight.'}, user.id, commit=False)
+    db.session.commit()
+    RecipeRepository.pending_after_commit().clear()
+
+    response = client.get('/recipes/Lemon%20Tart')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['instructions'] == 'Chill overnight.'
+    assert response.headers['ETag'].startswith(f'"recipe-{recipe.id}-v{recipe.version}-')
+    response = client.get('/recipes')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['recipes'][0]['instructions'] == 'Chill overnight.'
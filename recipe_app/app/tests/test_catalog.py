@@ -0,0 +1,87 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import delete, func, select
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.catalog import ingredient_filter
+from app.recipe.models import recipe_ingredient
+
+@pytest.fixture(scope='module')
+def test_app():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='pantryuser', password='pantrypassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'id': user.id, 'username': 'pantryuser'})
+
+        client = flask_app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        for title, names in [
+            ('Stir Fry', ['Garlic', 'ginger', 'Soy Sauce']),
+            ('Satay', ['garlic', 'Ginger', 'peanut']),
+            ('Garlic Bread', ['garlic', 'bread', 'butter']),
+        ]:
+            client.post('/recipes', headers=headers, json={
+                "title": title,
+                "description": "Pantry test.",
+                "ingredients": [{"name": name, "quantity": "1"} for name in names],
+                "instructions": "Cook."
+            })
+
+        yield flask_app, headers
+
+        db.session.remove()
+        db.drop_all()
+
+def titles(response):
+    return [recipe['title'] for recipe in response.get_json()['recipes']]
+
+def test_ingredient_filter_parsing():
+    assert ingredient_filter(' Garlic,ginger , GARLIC', '') == (('garlic', 'ginger'), ())
+    assert ingredient_filter('', None) is None
+
+def test_recipes_with_and_without_ingredients(test_app):
+    client = test_app[0].test_client()
+    assert titles(client.get('/recipes', query_string={'with': 'GARLIC,  ginger'})) == ['Stir Fry', 'Satay']
+    assert titles(client.get('/recipes', query_string={'with': 'garlic,ginger', 'without': 'peanut'})) == ['Stir Fry']
+    assert titles(client.get('/recipes', query_string={'without': 'ginger'})) == ['Garlic Bread']
+    assert titles(client.get('/recipes', query_string={'with': 'garlic,saffron'})) == []
+
+    response = client.get('/recipes', query_string={'with': 'garlic', 'cursor': '', 'per_page': 2, 'total': 'exact'})
+    assert titles(response) == ['Stir Fry', 'Satay']
+    assert response.get_json()['meta']['total'] == 3
+
+def test_links_follow_updates_and_deletes(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    client.patch('/recipes/Satay', headers=headers, json={
+        "ingredient_changes": {"remove": ["peanut"], "set": [{"name": "cashew", "quantity": "50 g"}]}
+    })
+    assert titles(client.get('/recipes', query_string={'with': 'garlic', 'without': 'peanut'})) == ['Stir Fry', 'Satay', 'Garlic Bread']
+    assert titles(client.get('/recipes', query_string={'with': 'cashew'})) == ['Satay']
+
+    client.delete('/recipes/Stir%20Fry', headers=headers)
+    assert titles(client.get('/recipes', query_string={'with': 'soy sauce'})) == []
+
+def test_imported_recipes_are_linked(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    client.post('/recipes/import', headers=headers, json=[
+        {"title": "Pesto", "description": "Green.", "ingredients": [{"name": "Basil"}, {"name": "garlic"}], "instructions": "Blend."}
+    ])
+    assert titles(client.get('/recipes', query_string={'with': 'basil,garlic'})) == ['Pesto']
+
+def test_backfill_rebuilds_links(test_app):
+    flask_app, headers = test_app
+    links = db.session.execute(select(func.count()).select_from(recipe_ingredient)).scalar()
+    db.session.execute(delete(recipe_ingredient))
+    db.session.commit()
+
+    result = flask_app.test_cli_runner().invoke(args=['recipes', 'backfill-ingredients', '--batch-size', '2'])
+    assert result.exit_code == 0, result.output
+    assert 'Linked ingredients for 3 recipes' in result.output
+    assert db.session.execute(select(func.count()).select_from(recipe_ingredient)).scalar() == links
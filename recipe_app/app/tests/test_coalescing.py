@@ -0,0 +1,122 @@
+import threading
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.coalescing import read_coalescer
+from app.recipe.model_repos.recipe_repo import RecipeRepository
+from app.singleflight import SingleFlight, FlightTimeout
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app({'TESTING': True, 'RECIPE_CACHE_ENABLED': False})
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        db.session.add(User(username='coalesceuser', password='coalescepassword'))
+        db.session.commit()
+        token = create_access_token(identity={'username': 'coalesceuser'})
+
+    yield flask_app, testing_client, {'Authorization': f'Bearer {token}'}
+
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached')
+        time.sleep(0.005)
+
+def test_single_flight_shares_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    threads = [threading.Thread(target=lambda: results.append(flights.do('key', slow, timeout=5))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flights.stats()['waiting'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [('value', False)] + [('value', True)] * 4
+    assert flights.stats() == {'calls': 1, 'shared': 4, 'timeouts': 0, 'in_flight': 0, 'waiting': 0}
+    assert flights.do('key', lambda: 'again') == ('again', False)
+
+def test_single_flight_shares_errors_and_times_out():
+    flights = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(5)
+        raise ValueError('boom')
+
+    def call(timeout):
+        try:
+            flights.do('key', failing, timeout=timeout)
+        except (ValueError, FlightTimeout) as e:
+            errors.append(type(e).__name__)
+
+    leader = threading.Thread(target=call, args=(5,))
+    leader.start()
+    wait_for(lambda: flights.stats()['in_flight'] == 1)
+    follower = threading.Thread(target=call, args=(5,))
+    follower.start()
+    call(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert sorted(errors) == ['FlightTimeout', 'ValueError', 'ValueError']
+    assert flights.stats()['timeouts'] == 1
+
+def test_concurrent_reads_share_one_query(test_client, monkeypatch):
+    flask_app, client, headers = test_client
+    recipe = {"title": "Herd Stew", "description": "Popular.", "ingredients": [{"name": "beans", "quantity": "1 can"}], "instructions": "Simmer."}
+    assert client.post('/recipes', headers=headers, json=recipe).status_code == 201
+
+    original = RecipeRepository.get_recipe_by_title
+    queries = []
+
+    def blocking_read(title, fields=None):
+        queries.append(title)
+        # Hold the query open until every other request is waiting on it
+        wait_for(lambda: read_coalescer.stats()['waiting'] == 4)
+        return original(title, fields)
+
+    monkeypatch.setattr(RecipeRepository, 'get_recipe_by_title', staticmethod(blocking_read))
+    before = read_coalescer.stats()
+    responses = []
+
+    def read():
+        responses.append(flask_app.test_client().get('/recipes/Herd Stew'))
+
+    threads = [threading.Thread(target=read) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(queries) == 1
+    assert [response.status_code for response in responses] == [200] * 5
+    assert all(response.get_json()['title'] == 'Herd Stew' for response in responses)
+    assert len({response.headers['ETag'] for response in responses}) == 1
+    assert sum(response.headers.get('X-Coalesced') == 'true' for response in responses) == 4
+    assert read_coalescer.stats()['shared'] - before['shared'] == 4
+
+    body = client.get('/metrics').data.decode()
+    assert 'recipe_api_recipe_coalescing_shared' in body
@@ -0,0 +1,99 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='etaguser', password='etagpassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'etaguser'})
+
+        yield testing_client, token
+
+        db.session.remove()
+        db.drop_all()
+
+RECIPE = {
+    "title": "Miso Soup",
+    "description": "Light and savoury.",
+    "ingredients": [{"name": "miso paste", "quantity": "3 tbsp"}, {"name": "tofu", "quantity": "150 g"}],
+    "instructions": "Warm the dashi and whisk in the miso."
+}
+
+def test_recipe_conditional_get(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/recipes', headers=headers, json=RECIPE)
+
+    response = client.get('/recipes/Miso%20Soup')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+
+    response = client.get('/recipes/Miso%20Soup', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    response = client.get('/recipes/Miso%20Soup', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+    client.put('/recipes/Miso%20Soup', headers=headers, json={**RECIPE, "instructions": "Do not boil the miso."})
+    response = client.get('/recipes/Miso%20Soup', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['instructions'] == 'Do not boil the miso.'
+
+def test_recipe_list_conditional_get(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get('/recipes')
+    etag = response.headers['ETag']
+    assert client.get('/recipes', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/recipes', query_string={'page': 2}, headers={'If-None-Match': etag}).status_code == 200
+
+    client.post('/recipes', headers=headers, json={**RECIPE, "title": "Miso Ramen"})
+    response = client.get('/recipes', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    # Same counts and ids, new content
+    client.put('/recipes/Miso%20Ramen', headers=headers, json={**RECIPE, "title": "Miso Ramen", "instructions": "Add noodles."})
+    response = client.get('/recipes', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    # Recounting the stats never hands out an earlier version again
+    assert client.application.test_cli_runner().invoke(args=['recipes', 'rebuild-stats']).exit_code == 0
+    assert client.get('/recipes', headers={'If-None-Match': etag}).status_code == 200
+
+def test_recreated_recipe_gets_a_new_etag(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/recipes', headers=headers, json={**RECIPE, "title": "Miso Glaze"})
+    response = client.get('/recipes/Miso%20Glaze')
+    etag = response.headers['ETag']
+    recipe_id = response.get_json()['id']
+
+    # The newest recipe's id can be handed out again
+    client.delete('/recipes/Miso%20Glaze', headers=headers)
+    client.post('/recipes', headers=headers, json={**RECIPE, "title": "Miso Glaze", "instructions": "Brush on and grill."})
+    response = client.get('/recipes/Miso%20Glaze', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['instructions'] == 'Brush on and grill.'
+    if response.get_json()['id'] == recipe_id:
+        assert response.headers['ETag'] != etag
+
+def test_missing_recipe_is_not_found(test_client):
+    client, token = test_client
+    assert client.get('/recipes/Nothing%20Here').status_code == 404
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+
+@pytest.fixture(scope='module')
+def test_app():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+    flask_app.config['RECIPE_EXPORT_CHUNK_SIZE'] = 2
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='exportuser', password='exportpassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'exportuser'})
+
+        client = flask_app.test_client()
+        for number in range(1, 6):
+            client.post('/recipes', headers={'Authorization': f'Bearer {token}'}, json={
+                "title": f"Bread {number}",
+                "description": "Sourdough" if number <= 2 else "Rye",
+                "ingredients": [{"name": "flour", "quantity": "500 g"}, {"name": "salt", "quantity": f"{number} g"}],
+                "instructions": "Knead, proof, bake."
+            })
+
+        yield flask_app
+
+        db.session.remove()
+        db.drop_all()
+
+def test_export_ndjson(test_app):
+    response = test_app.test_client().get('/recipes/export')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    recipes = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [recipe['title'] for recipe in recipes] == [f'Bread {number}' for number in range(1, 6)]
+    assert recipes[4]['ingredients'] == [{'name': 'flour', 'quantity': '500 g'}, {'name': 'salt', 'quantity': '5 g'}]
+
+def test_export_csv_with_search(test_app):
+    response = test_app.test_client().get('/recipes/export', query_string={'format': 'csv', 'search': 'sourdough'})
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+    assert [row['title'] for row in rows] == ['Bread 1', 'Bread 2']
+    assert json.loads(rows[0]['ingredients'])[1] == {'name': 'salt', 'quantity': '1 g'}
+
+def test_export_rejects_unknown_format(test_app):
+    assert test_app.test_client().get('/recipes/export', query_string={'format': 'xml'}).status_code == 400
+
+def test_export_cli(test_app):
+    result = test_app.test_cli_runner().invoke(args=['recipes', 'export', '--search', 'rye'])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line)['title'] for line in result.output.splitlines()] == ['Bread 3', 'Bread 4', 'Bread 5']
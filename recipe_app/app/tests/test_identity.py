@@ -0,0 +1,66 @@
+import bcrypt
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.identity import identity_cache
+from app.auth.models import User
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        for username in ('owner', 'intruder'):
+            password = bcrypt.hashpw(b'secret', bcrypt.gensalt(4)).decode('utf-8')
+            db.session.add(User(username=username, password=password))
+        db.session.commit()
+
+        yield testing_client
+
+        db.session.remove()
+        db.drop_all()
+
+def login(client, username):
+    response = client.post('/login', json={'username': username, 'password': 'secret'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+RECIPE = {
+    "title": "Shakshuka",
+    "ingredients": [{"name": "eggs", "quantity": "4"}],
+    "instructions": "Poach the eggs in spiced tomato sauce."
+}
+
+def test_identity_is_resolved_once(test_client):
+    identity_cache.backend.clear()
+    headers = login(test_client, 'owner')
+    misses = identity_cache.backend.misses
+
+    response = test_client.post('/recipes', headers=headers, json=RECIPE)
+    assert response.status_code == 201
+    assert response.get_json()['recipe']['created_by'] == 'owner'
+    test_client.patch('/recipes/Shakshuka', headers=headers, json={"description": "Spicy."})
+
+    assert identity_cache.backend.misses == misses + 1
+    assert identity_cache.backend.hits >= 1
+
+def test_ownership_is_checked_by_id(test_client):
+    headers = login(test_client, 'intruder')
+    assert test_client.patch('/recipes/Shakshuka', headers=headers, json={"description": "Mine now."}).status_code == 403
+    assert test_client.delete('/recipes/Shakshuka', headers=headers).status_code == 403
+
+def test_renamed_user_tokens_are_rejected(test_client):
+    headers = login(test_client, 'intruder')
+    assert test_client.post('/recipes', headers=headers, json={**RECIPE, "title": "Menemen"}).status_code == 201
+
+    user = User.query.filter_by(username='intruder').one()
+    user.username = 'former-intruder'
+    db.session.commit()
+    assert test_client.post('/recipes', headers=headers, json={**RECIPE, "title": "Menemen"}).status_code == 401
+
+def test_legacy_username_tokens_still_work(test_client):
+    headers = {'Authorization': f"Bearer {create_access_token(identity={'username': 'owner'})}"}
+    assert test_client.delete('/recipes/Shakshuka', headers=headers).status_code == 200
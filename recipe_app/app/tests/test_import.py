@@ -0,0 +1,138 @@
+import io
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.importer import ImportFormatError, JsonArrayReader
+from app.recipe.models import Recipe
+
+@pytest.fixture(scope='module')
+def test_app():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='importuser', password='importpassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'importuser'})
+
+        yield flask_app, token
+
+        db.session.remove()
+        db.drop_all()
+
+def recipe(number):
+    return {
+        "title": f"Imported Curry {number}",
+        "description": "From the bulk loader.",
+        "ingredients": [{"name": "turmeric", "quantity": "1 tsp"}, {"name": "coconut milk", "quantity": "400 ml"}],
+        "instructions": "Simmer."
+    }
+
+def test_import_ndjson_reports_bad_rows(test_app):
+    flask_app, token = test_app
+    lines = [json.dumps(recipe(1)), json.dumps(recipe(2)), '{not json', json.dumps({"title": "No ingredients"}), '', json.dumps(recipe(3))]
+    response = flask_app.test_client().post(
+        '/recipes/import?batch_size=2',
+        headers={'Authorization': f'Bearer {token}'},
+        data='\n'.join(lines),
+        content_type='application/x-ndjson'
+    )
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['imported'] == 3
+    assert report['failed'] == 2
+    assert report['batches'] == 2
+    assert [error['row'] for error in report['errors']] == [3, 4]
+    assert report['errors'][1]['error'] == 'Missing fields: ingredients, instructions'
+
+    imported = Recipe.query.filter(Recipe.title.like('Imported Curry%')).order_by(Recipe.id).all()
+    assert [r.title for r in imported] == ['Imported Curry 1', 'Imported Curry 2', 'Imported Curry 3']
+    assert all(len(r.ingredients) == 2 for r in imported)
+
+    response = flask_app.test_client().get('/recipes', query_string={'search': 'coconut', 'per_page': 50})
+    assert response.get_json()['meta']['total'] == 3
+
+def test_import_json_array(test_app):
+    flask_app, token = test_app
+    response = flask_app.test_client().post(
+        '/recipes/import',
+        headers={'Authorization': f'Bearer {token}'},
+        data=json.dumps([recipe(4), recipe(5)]),
+        content_type='application/json'
+    )
+    report = response.get_json()
+    assert report['imported'] == 2
+    assert report['failed'] == 0
+
+def test_import_cli(test_app, tmp_path):
+    flask_app, token = test_app
+    source = tmp_path / 'recipes.ndjson'
+    source.write_text('\n'.join(json.dumps(recipe(number)) for number in range(6, 11)))
+
+    result = flask_app.test_cli_runner().invoke(args=['recipes', 'import', str(source), '--username', 'importuser', '--batch-size', '2'])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report['imported'] == 5
+    assert report['batches'] == 3
+
+def test_json_array_reader_bounds_bad_elements():
+    valid = [recipe(number) for number in range(3)]
+    data = json.dumps(valid).encode()
+    assert [row for _, row in JsonArrayReader(io.BytesIO(data), chunk_size=5)] == valid
+
+    # A syntax error well inside the buffer is reported without reading on
+    stream = io.BytesIO(b'[' + json.dumps(recipe(0)).encode() + b', {"title": "Broken",, }' + b', {"title": "x"}' * 100000 + b']')
+    with pytest.raises(ImportFormatError) as error:
+        list(JsonArrayReader(stream, chunk_size=1024))
+    assert error.value.row == 2
+    assert stream.tell() <= 2048
+
+    # An element that never ends stops at the size limit
+    stream = io.BytesIO(b'[{"title": "' + b'a' * 1000000)
+    with pytest.raises(ImportFormatError, match='larger than 10000 characters') as error:
+        list(JsonArrayReader(stream, chunk_size=1024, max_element_size=10000))
+    assert error.value.row == 1
+    assert stream.tell() <= 12 * 1024
+
+def test_import_json_array_reports_oversized_element(test_app):
+    flask_app, token = test_app
+    flask_app.config['RECIPE_IMPORT_MAX_ELEMENT_SIZE'] = 1000
+    try:
+        response = flask_app.test_client().post(
+            '/recipes/import',
+            headers={'Authorization': f'Bearer {token}'},
+            data=json.dumps([recipe(11), {**recipe(12), "instructions": "Stir. " * 500}, recipe(13)]),
+            content_type='application/json'
+        )
+    finally:
+        flask_app.config['RECIPE_IMPORT_MAX_ELEMENT_SIZE'] = 1024 * 1024
+    report = response.get_json()
+    assert report['imported'] == 1
+    assert report['errors'] == [{'row': 2, 'error': 'Array element is larger than 1000 characters'}]
+
+def test_import_rejects_values_of_the_wrong_type_per_row(test_app):
+    flask_app, token = test_app
+    rows = [
+        recipe(14),
+        {**recipe(15), "description": {"text": "nested"}},
+        {**recipe(16), "instructions": ["Stir."]},
+        {**recipe(17), "ingredients": [{"name": "rice", "quantity": {"cups": 2}}]},
+        recipe(18),
+    ]
+    response = flask_app.test_client().post(
+        '/recipes/import',
+        headers={'Authorization': f'Bearer {token}'},
+        data=json.dumps(rows),
+        content_type='application/json'
+    )
+    report = response.get_json()
+    assert report['imported'] == 2
+    assert report['errors'] == [
+        {'row': 2, 'error': 'Description must be a string'},
+        {'row': 3, 'error': 'Instructions must be a string'},
+        {'row': 4, 'error': 'Ingredient quantity must be a string or number'},
+    ]
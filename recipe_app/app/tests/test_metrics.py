@@ -0,0 +1,77 @@
+import logging
+import pytest
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.instrumentation import request_metrics
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    @flask_app.route('/n-plus-one')
+    def n_plus_one():
+        users = [User.query.filter_by(username=f'user{number}').first() for number in range(6)]
+        return jsonify(found=len([user for user in users if user]))
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        request_metrics.reset()
+
+        yield testing_client, flask_app
+
+        db.session.remove()
+        db.drop_all()
+
+def test_server_timing_header(test_client):
+    client, flask_app = test_client
+    response = client.get('/recipes', query_string={'cursor': ''})
+    timings = {part.split(';')[0]: part for part in response.headers['Server-Timing'].split(', ')}
+    assert set(timings) >= {'handler', 'db', 'serialize'}
+    assert 'queries"' in timings['db']
+
+def test_metrics_endpoint(test_client):
+    client, flask_app = test_client
+    client.get('/recipes')
+    body = client.get('/metrics').data.decode()
+    assert 'recipe_api_request_duration_seconds_bucket{endpoint="recipes.get_recipes",method="GET",le="+Inf"}' in body
+    assert 'recipe_api_requests_total{endpoint="recipes.get_recipes",method="GET",status="200"}' in body
+    assert 'recipe_api_db_statements_total{endpoint="recipes.get_recipes",method="GET"}' in body
+    assert 'recipe_api_recipe_cache_misses' in body
+
+def test_n_plus_one_is_reported(test_client, caplog):
+    client, flask_app = test_client
+    with caplog.at_level(logging.WARNING):
+        client.get('/n-plus-one')
+    assert any('Possible N+1 in n_plus_one: 6 identical statements' in message for message in caplog.messages)
+    assert 'recipe_api_n_plus_one_requests_total{endpoint="n_plus_one",method="GET"} 1' in client.get('/metrics').data.decode()
+
+def test_slow_query_log(test_client, caplog):
+    client, flask_app = test_client
+    flask_app.config['SLOW_QUERY_MS'] = 0.000001
+    try:
+        with caplog.at_level(logging.WARNING):
+            client.get('/recipes/Slow%20Soup')
+    finally:
+        flask_app.config['SLOW_QUERY_MS'] = 0
+    assert any('Slow query' in message and "'Slow Soup'" in message for message in caplog.messages)
+
+def test_creating_a_recipe_is_not_an_n_plus_one(test_client, caplog):
+    client, flask_app = test_client
+    db.session.add(User(username='metricsuser', password='metricspassword'))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity={"username": "metricsuser"})}'}
+    with caplog.at_level(logging.WARNING):
+        response = client.post('/recipes', headers=headers, json={
+            "title": "Minestrone",
+            "description": "",
+            "ingredients": [{"name": name, "quantity": "1"} for name in ('bean', 'carrot', 'celery', 'onion', 'pasta', 'tomato')],
+            "instructions": "Simmer."
+        })
+    assert response.status_code == 201
+    assert not any('Possible N+1' in message for message in caplog.messages)
+    assert [ing['name'] for ing in client.get('/recipes/Minestrone').get_json()['ingredients']] == ['bean', 'carrot', 'celery', 'onion', 'pasta', 'tomato']
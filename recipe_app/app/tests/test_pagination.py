@@ -0,0 +1,87 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.pagination import encode_cursor
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='pageuser', password='pagepassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'pageuser'})
+
+        for number in range(1, 8):
+            testing_client.post('/recipes', headers={'Authorization': f'Bearer {token}'}, json={
+                "title": f"Pancakes {number}",
+                "description": "Fluffy pancakes." if number % 2 else "Crepes, really.",
+                "ingredients": [{"name": "flour", "quantity": "200 g"}, {"name": "egg", "quantity": str(number)}],
+                "instructions": "Whisk and fry."
+            })
+
+        yield testing_client, token
+
+        db.session.remove()
+        db.drop_all()
+
+def walk(client, **params):
+    titles = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get('/recipes', query_string={**params, 'cursor': cursor})
+        assert response.status_code == 200
+        body = response.get_json()
+        titles.extend(recipe['title'] for recipe in body['recipes'])
+        assert all(recipe['ingredients'] for recipe in body['recipes'])
+        cursor = body['meta']['next_cursor']
+    return titles
+
+def test_cursor_walks_every_recipe_once(test_client):
+    client, token = test_client
+    assert walk(client, per_page=3) == [f'Pancakes {number}' for number in range(1, 8)]
+
+def test_cursor_with_search(test_client):
+    client, token = test_client
+    assert sorted(walk(client, per_page=2, search='fluffy')) == ['Pancakes 1', 'Pancakes 3', 'Pancakes 5', 'Pancakes 7']
+
+def test_cursor_with_search_keeps_tied_scores(test_client):
+    client, token = test_client
+    # The matching recipes only differ in their number, so every page boundary falls inside a tie
+    assert walk(client, per_page=1, search='fluffy') == ['Pancakes 1', 'Pancakes 3', 'Pancakes 5', 'Pancakes 7']
+
+def test_cursor_total_is_optional(test_client):
+    client, token = test_client
+    response = client.get('/recipes', query_string={'cursor': '', 'per_page': 2})
+    assert 'total' not in response.get_json()['meta']
+
+    response = client.get('/recipes', query_string={'cursor': '', 'per_page': 2, 'total': 'exact'})
+    assert response.get_json()['meta']['total'] == 7
+
+def test_invalid_cursor(test_client):
+    client, token = test_client
+    response = client.get('/recipes', query_string={'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
+
+def test_page_mode_is_unchanged(test_client):
+    client, token = test_client
+    response = client.get('/recipes', query_string={'page': 2, 'per_page': 3})
+    body = response.get_json()
+    assert body['meta'] == {'page': 2, 'pages': 3, 'per_page': 3, 'total': 7}
+    assert [recipe['title'] for recipe in body['recipes']] == ['Pancakes 4', 'Pancakes 5', 'Pancakes 6']
+
+def test_cursor_page_size_and_keys_are_checked(test_client):
+    client, token = test_client
+    for per_page in (0, -1):
+        meta = client.get('/recipes', query_string={'cursor': '', 'per_page': per_page}).get_json()['meta']
+        assert meta == {'per_page': 20, 'next_cursor': None}
+
+    for key in ({'id': True}, {'id': 1, 'score': False}):
+        cursor = encode_cursor(key)
+        assert client.get('/recipes', query_string={'cursor': cursor}).status_code == 400
@@ -0,0 +1,68 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.model_repos.recipe_repo import RecipeRepository
+from app.recipe.models import Recipe
+
+@pytest.fixture(scope='module')
+def test_app(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('replicas')
+    flask_app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{directory / "primary.db"}',
+        'SQLALCHEMY_BINDS': {'replica0': f'sqlite:///{directory / "replica.db"}'},
+        'RECIPE_CACHE_ENABLED': False,
+    })
+
+    with flask_app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica0'])
+        # The replica lags behind: it only has a recipe the primary has since deleted
+        for engine, title in ((db.engines[None], 'Primary Pie'), (db.engines['replica0'], 'Stale Stew')):
+            with engine.begin() as connection:
+                connection.execute(User.__table__.insert(), {'id': 1, 'username': 'replicauser', 'password': 'x'})
+                connection.execute(Recipe.__table__.insert(), {'id': 1, 'title': title, 'created_by': 1})
+        token = create_access_token(identity={'id': 1, 'username': 'replicauser'})
+
+    yield flask_app, {'Authorization': f'Bearer {token}'}
+
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(db.engines['replica0'])
+    # init_app registered an (empty) metadata for the bind on the shared db object
+    db.metadatas.pop('replica0', None)
+
+def titles(response):
+    return [recipe['title'] for recipe in response.get_json()['recipes']]
+
+def test_reads_go_to_the_replica(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    assert titles(client.get('/recipes')) == ['Stale Stew']
+    assert client.get('/recipes/Stale%20Stew').status_code == 200
+    assert client.get('/recipes/Primary%20Pie').status_code == 404
+
+def test_writes_go_to_the_primary(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    response = client.patch('/recipes/Primary%20Pie', headers=headers, json={'description': 'Flaky.'})
+    assert response.status_code == 200
+    with flask_app.app_context():
+        assert db.session.get(Recipe, 1).description == 'Flaky.'
+
+def test_reads_after_a_write_stay_on_the_primary(test_app):
+    flask_app, headers = test_app
+    with flask_app.test_request_context():
+        assert RecipeRepository.get_recipe_stamp('Primary Pie') is None
+        RecipeRepository.patch_recipe('Primary Pie', {'instructions': 'Bake.'}, 1)
+        assert RecipeRepository.get_recipe_by_title('Primary Pie').instructions == 'Bake.'
+        assert RecipeRepository.get_recipe_stamp('Primary Pie') is not None
+        db.session.remove()
+
+def test_pool_stats_are_exported(test_app):
+    flask_app, headers = test_app
+    body = flask_app.test_client().get('/metrics').data.decode()
+    assert 'recipe_api_db_pool_primary_checkedout' in body
+    assert 'recipe_api_db_pool_replica0_checkedout' in body
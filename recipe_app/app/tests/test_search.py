@@ -0,0 +1,86 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.search import PostgresSearchBackend
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='searchuser', password='searchpassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'searchuser'})
+
+        for payload in RECIPES:
+            testing_client.post('/recipes', headers={'Authorization': f'Bearer {token}'}, json=payload)
+
+        yield testing_client, token
+
+        db.session.remove()
+        db.drop_all()
+
+RECIPES = [
+    {
+        "title": "Garlic Noodles",
+        "description": "Buttery noodles tossed with plenty of garlic.",
+        "ingredients": [{"name": "egg noodles", "quantity": "200 g"}, {"name": "garlic", "quantity": "6 cloves"}],
+        "instructions": "Boil the noodles and toss with garlic butter."
+    },
+    {
+        "title": "Ginger Chicken",
+        "description": "A quick stir fry.",
+        "ingredients": [{"name": "chicken thigh", "quantity": "500 g"}, {"name": "ginger", "quantity": "2 tbsp"}, {"name": "garlic", "quantity": "2 cloves"}],
+        "instructions": "Stir fry everything."
+    },
+    {
+        "title": "Tomato Soup",
+        "description": "Smooth and comforting.",
+        "ingredients": [{"name": "tomatoes", "quantity": "1 kg"}, {"name": "onion", "quantity": "1"}],
+        "instructions": "Simmer and blend."
+    },
+]
+
+def search_titles(client, query):
+    response = client.get('/recipes', query_string={'search': query})
+    assert response.status_code == 200
+    return [recipe['title'] for recipe in response.get_json()['recipes']]
+
+def test_search_ranks_title_matches_first(test_client):
+    client, token = test_client
+    assert search_titles(client, 'garlic') == ['Garlic Noodles', 'Ginger Chicken']
+
+def test_search_matches_prefixes_of_every_term(test_client):
+    client, token = test_client
+    assert search_titles(client, 'gar ging') == ['Ginger Chicken']
+    assert search_titles(client, 'tomat') == ['Tomato Soup']
+    assert search_titles(client, 'comfort') == ['Tomato Soup']
+    assert search_titles(client, 'garlic tomato') == []
+
+def test_search_index_follows_updates_and_deletes(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    client.put('/recipes/Tomato%20Soup', headers=headers, json={
+        "title": "Roasted Tomato Soup",
+        "description": "Smooth and comforting.",
+        "ingredients": [{"name": "tomatoes", "quantity": "1 kg"}, {"name": "basil", "quantity": "1 bunch"}],
+        "instructions": "Roast, simmer and blend."
+    })
+    assert search_titles(client, 'roasted basil') == ['Roasted Tomato Soup']
+    assert search_titles(client, 'onion') == []
+
+    client.delete('/recipes/Roasted%20Tomato%20Soup', headers=headers)
+    assert search_titles(client, 'tomato') == []
+
+def test_postgres_scores_are_double_precision(test_client):
+    from sqlalchemy.dialects import postgresql
+
+    # A real score does not compare equal to itself once it comes back in a cursor
+    sql = str(PostgresSearchBackend().match(['garlic']).compile(dialect=postgresql.dialect()))
+    assert 'CAST(ts_rank_cd(' in sql and 'AS FLOAT(53)) AS score' in sql
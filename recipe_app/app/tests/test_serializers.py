@@ -0,0 +1,85 @@
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.auth.models import User
+from app.recipe import serializers
+from app.recipe.serializers import InvalidFields, parse_fields
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='fieldsuser', password='fieldspassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'id': user.id, 'username': 'fieldsuser'})
+        testing_client.post('/recipes', headers={'Authorization': f'Bearer {token}'}, json={
+            "title": "Miso Soup",
+            "description": "Quick and savoury.",
+            "ingredients": [{"name": "miso", "quantity": "2 tbsp"}, {"name": "tofu", "quantity": "100 g"}],
+            "instructions": "Dissolve the miso in hot dashi."
+        })
+
+        yield testing_client
+
+        db.session.remove()
+        db.drop_all()
+
+def capture_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lower())
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', record)
+
+def test_parse_fields():
+    assert parse_fields('title, id') == ('id', 'title')
+    assert parse_fields('') == serializers.RECIPE_FIELDS
+    with pytest.raises(InvalidFields):
+        parse_fields('id,secret')
+
+def test_dumps_falls_back_to_stdlib(monkeypatch):
+    payload = {'title': 'Crème brûlée', 'ingredients': [{'name': 'cream', 'quantity': None}]}
+    fast = serializers.dumps(payload)
+    monkeypatch.setattr(serializers, 'orjson', None)
+    assert json.loads(serializers.dumps(payload)) == json.loads(fast) == payload
+
+def test_list_with_sparse_fields_skips_ingredients(test_client):
+    statements, stop = capture_statements()
+    try:
+        response = test_client.get('/recipes', query_string={'fields': 'id,title'})
+    finally:
+        stop()
+    assert response.status_code == 200
+    assert response.get_json()['recipes'] == [{'id': 1, 'title': 'Miso Soup'}]
+    assert not any('from ingredient' in statement for statement in statements)
+    page_query = next(statement for statement in statements if 'limit' in statement)
+    assert 'recipe.instructions' not in page_query and 'recipe.description' not in page_query
+
+def test_cursor_and_single_recipe_with_sparse_fields(test_client):
+    response = test_client.get('/recipes', query_string={'cursor': '', 'fields': 'title,ingredients'})
+    assert response.get_json()['recipes'] == [{
+        'title': 'Miso Soup',
+        'ingredients': [{'name': 'miso', 'quantity': '2 tbsp'}, {'name': 'tofu', 'quantity': '100 g'}]
+    }]
+
+    full = test_client.get('/recipes/Miso%20Soup')
+    sparse = test_client.get('/recipes/Miso%20Soup', query_string={'fields': 'description'})
+    assert set(full.get_json()) == {'id', 'title', 'description', 'ingredients', 'instructions'}
+    assert sparse.get_json() == {'description': 'Quick and savoury.'}
+    assert sparse.headers['X-Cache'] == 'MISS'
+    assert full.headers['ETag'] != sparse.headers['ETag']
+
+def test_unknown_fields_are_rejected(test_client):
+    response = test_client.get('/recipes', query_string={'fields': 'id,password'})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Unknown fields: password'
@@ -0,0 +1,68 @@
+import sqlite3
+from sqlalchemy import inspect
+from app import create_app, db
+from app.commands import init_db_command
+
+def test_create_app_does_not_connect(tmp_path):
+    # Nothing can be opened at this path, so any connection would fail
+    flask_app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "missing" / "recipes.db"}',
+    })
+
+    assert 'recipes.get_recipes' in flask_app.view_functions
+    assert not (tmp_path / 'missing').exists()
+
+def test_init_db_creates_the_schema(tmp_path):
+    flask_app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "recipes.db"}'})
+
+    result = flask_app.test_cli_runner().invoke(init_db_command)
+
+    assert result.exit_code == 0, result.output
+    assert 'Initialized the database' in result.output
+    with flask_app.app_context():
+        assert {'user', 'recipe', 'ingredient'} <= set(inspect(db.engine).get_table_names())
+        db.engine.dispose()
+
+def test_init_db_reports_an_unreachable_database(tmp_path):
+    flask_app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "missing" / "recipes.db"}',
+    })
+
+    result = flask_app.test_cli_runner().invoke(init_db_command)
+
+    assert result.exit_code == 1
+    assert 'Database not reachable' in result.output
+
+def test_init_db_adds_new_columns_to_existing_tables(tmp_path):
+    database = tmp_path / 'recipes.db'
+    flask_app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+    with sqlite3.connect(database) as connection:
+        connection.executescript('''
+            CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(150) NOT NULL UNIQUE, password VARCHAR(150) NOT NULL);
+            CREATE TABLE recipe (id INTEGER PRIMARY KEY, title VARCHAR(150) NOT NULL, description TEXT,
+                                 instructions TEXT, created_by INTEGER NOT NULL REFERENCES user (id));
+            CREATE TABLE ingredient (id INTEGER PRIMARY KEY, name VARCHAR(150) NOT NULL, quantity VARCHAR(50),
+                                     recipe_id INTEGER NOT NULL REFERENCES recipe (id));
+            INSERT INTO user VALUES (1, 'olduser', 'x');
+            INSERT INTO recipe VALUES (1, 'Old Stew', 'From before.', 'Simmer.', 1);
+            INSERT INTO ingredient VALUES (1, 'beans', '1 can', 1);
+        ''')
+    connection.close()
+
+    result = flask_app.test_cli_runner().invoke(init_db_command)
+    assert result.exit_code == 0, result.output
+    assert 'Added column recipe.version' in result.output
+    assert 'Added column recipe.updated_at' in result.output
+
+    response = flask_app.test_client().get('/recipes/Old%20Stew')
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('"recipe-1-v1')
+    assert flask_app.test_client().get('/recipes').get_json()['recipes'][0]['title'] == 'Old Stew'
+
+    result = flask_app.test_cli_runner().invoke(init_db_command)
+    assert 'Added column' not in result.output
+    with flask_app.app_context():
+        assert 'ix_recipe_updated_at' in {index['name'] for index in inspect(db.engine).get_indexes('recipe')}
+        db.engine.dispose()
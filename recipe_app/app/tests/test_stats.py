@@ -0,0 +1,94 @@
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+
+@pytest.fixture(scope='module')
+def test_app():
+    flask_app = create_app({'TESTING': True})
+
+    with flask_app.app_context():
+        db.create_all()
+        headers = {}
+        for username in ('statsuser', 'otherstatsuser'):
+            user = User(username=username, password='statspassword')
+            db.session.add(user)
+            db.session.commit()
+            token = create_access_token(identity={'id': user.id, 'username': username})
+            headers[username] = {'Authorization': f'Bearer {token}'}
+
+        yield flask_app, flask_app.test_client(), headers
+
+        db.session.remove()
+        db.drop_all()
+
+def recipe(title, *names):
+    return {
+        "title": title,
+        "description": "Stats test.",
+        "ingredients": [{"name": name, "quantity": "1"} for name in names],
+        "instructions": "Cook."
+    }
+
+def stats(client, **args):
+    response = client.get('/recipes/stats', query_string=args)
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_stats_follow_writes(test_app):
+    flask_app, client, headers = test_app
+    assert stats(client)['recipes'] == 0
+
+    client.post('/recipes', headers=headers['statsuser'], json=recipe('Soup', 'Onion', 'salt', 'water'))
+    client.post('/recipes', headers=headers['statsuser'], json=recipe('Stew', 'onion', 'beef'))
+    client.post('/recipes', headers=headers['otherstatsuser'], json=recipe('Salad', 'lettuce', 'Salt'))
+    client.patch('/recipes/Stew', headers=headers['statsuser'], json={'ingredients': [
+        {'name': 'onion', 'quantity': '2'}, {'name': 'beef'}, {'name': 'salt'}, {'name': 'pepper'}
+    ]})
+    client.delete('/recipes/Soup', headers=headers['statsuser'])
+    client.post('/recipes/import', headers=headers['otherstatsuser'], content_type='application/json',
+                data=json.dumps([recipe('Slaw', 'cabbage', 'salt'), recipe('Toast', 'bread')]))
+
+    summary = stats(client, limit=3)
+    assert summary['recipes'] == 4
+    assert summary['authors'] == 2
+    assert summary['ingredients'] == 9
+    assert summary['distinct_ingredients'] == 7
+    assert summary['average_ingredients_per_recipe'] == 2.25
+    assert summary['top_authors'] == [{'username': 'otherstatsuser', 'recipes': 3}, {'username': 'statsuser', 'recipes': 1}]
+    assert summary['top_ingredients'][0] == {'name': 'salt', 'recipes': 3}
+    assert len(summary['top_ingredients']) == 3
+
+    client.delete('/recipes/Stew', headers=headers['statsuser'])
+    summary = stats(client)
+    assert summary['authors'] == 1
+    assert summary['top_authors'] == [{'username': 'otherstatsuser', 'recipes': 3}]
+
+def test_rolled_back_batch_leaves_stats_alone(test_app):
+    flask_app, client, headers = test_app
+    before = stats(client)
+    response = client.post('/recipes/batch', headers=headers['statsuser'], json={'operations': [
+        {'op': 'create', 'data': recipe('Pie', 'apple', 'flour')},
+        {'op': 'delete', 'title': 'Nobody Made This'},
+    ]})
+    assert response.status_code == 404
+    assert stats(client) == before
+
+def test_rebuild_matches_incremental_counts(test_app):
+    flask_app, client, headers = test_app
+    client.post('/recipes/batch', headers=headers['statsuser'], json={'mode': 'continue', 'operations': [
+        {'op': 'create', 'data': recipe('Pie', 'apple', 'flour', 'butter')},
+        {'op': 'patch', 'title': 'Pie', 'data': {'ingredient_changes': {'remove': ['butter']}}},
+        {'op': 'create', 'data': recipe('Tart', 'apple', 'sugar')},
+        {'op': 'delete', 'title': 'Tart'},
+        {'op': 'delete', 'title': 'Toast'},
+    ]})
+    incremental = stats(client, limit=100)
+    assert incremental['recipes'] == 4
+    assert {'name': 'apple', 'recipes': 1} in incremental['top_ingredients']
+
+    result = flask_app.test_cli_runner().invoke(args=['recipes', 'rebuild-stats'])
+    assert result.exit_code == 0, result.output
+    assert 'Counted 4 recipes by 2 authors' in result.output
+    assert stats(client, limit=100) == incremental
@@ -0,0 +1,153 @@
+import threading
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.suggest import SuggestIndex, suggest_index
+
+@pytest.fixture(scope='module')
+def test_app():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='suggestuser', password='suggestpassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'id': user.id, 'username': 'suggestuser'})
+
+        client = flask_app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        for title, names in [
+            ('Garlic Bread', ['garlic', 'bread']),
+            ('Roast Garlic Soup', ['garlic', 'stock']),
+            ('Gazpacho', ['tomato', 'garlic', 'cucumber']),
+        ]:
+            client.post('/recipes', headers=headers, json={
+                "title": title,
+                "description": "Suggest test.",
+                "ingredients": [{"name": name, "quantity": "1"} for name in names],
+                "instructions": "Cook."
+            })
+
+        yield flask_app, headers
+
+        db.session.remove()
+        db.drop_all()
+
+def suggestions(client, q, **params):
+    response = client.get('/recipes/suggest', query_string=dict(params, q=q))
+    assert response.status_code == 200
+    return [(item['type'], item['text'], item['count']) for item in response.get_json()['suggestions']]
+
+def test_suggestions_rank_by_popularity(test_app):
+    client = test_app[0].test_client()
+    assert suggestions(client, 'Ga') == [
+        ('ingredient', 'garlic', 3),
+        ('title', 'Gazpacho', 1),
+        ('title', 'Garlic Bread', 1),
+        ('title', 'Roast Garlic Soup', 1),
+    ]
+    assert suggestions(client, 'ga', limit=1) == [('ingredient', 'garlic', 3)]
+    assert suggestions(client, 'soup') == [('title', 'Roast Garlic Soup', 1)]
+    assert suggestions(client, '  ') == []
+
+def test_index_follows_writes(test_app):
+    flask_app, headers = test_app
+    client = flask_app.test_client()
+    assert suggest_index.built
+
+    client.post('/recipes', headers=headers, json={
+        "title": "Tomato Salad", "description": "", "instructions": "Slice.",
+        "ingredients": [{"name": "Tomato", "quantity": "3"}]
+    })
+    assert suggestions(client, 'tom') == [('ingredient', 'tomato', 2), ('title', 'Tomato Salad', 1)]
+
+    client.put('/recipes/Gazpacho', headers=headers, json={
+        "title": "Cold Soup", "description": "", "instructions": "Blend.",
+        "ingredients": [{"name": "cucumber", "quantity": "1"}]
+    })
+    assert suggestions(client, 'gaz') == []
+    assert suggestions(client, 'tom') == [('ingredient', 'tomato', 1), ('title', 'Tomato Salad', 1)]
+
+    client.delete('/recipes/Cold%20Soup', headers=headers)
+    assert suggestions(client, 'cu') == []
+    assert suggestions(client, 'soup') == [('title', 'Roast Garlic Soup', 1)]
+
+def test_rebuild_matches_incremental_state(test_app):
+    rebuilt = SuggestIndex()
+    rebuilt.build()
+    assert rebuilt.entries == suggest_index.entries
+    assert rebuilt.keys == suggest_index.keys
+    assert suggest_index.stats()['memory_bytes'] > 0
+
+def counting_builds(index, release=None):
+    builds = []
+    build = index._build
+
+    def slow_build():
+        builds.append(threading.current_thread().name)
+        if release is not None:
+            release.wait(5)
+        build()
+
+    index._build = slow_build
+    return builds
+
+def test_first_requests_share_one_build(test_app):
+    flask_app = test_app[0]
+    index = SuggestIndex()
+    builds = counting_builds(index)
+    results = []
+
+    def lookup():
+        with flask_app.app_context():
+            results.append(index.suggest('garl'))
+
+    threads = [threading.Thread(target=lookup) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert len(results) == 6 and all(result == results[0] for result in results)
+    assert results[0][0]['text'] == 'garlic'
+
+def test_refresh_runs_in_the_background(test_app):
+    flask_app = test_app[0]
+    index = SuggestIndex()
+    index.build()
+    index.refresh_seconds = 1
+    index.built_at -= 10
+    release = threading.Event()
+    builds = counting_builds(index, release)
+
+    # Stale lookups answer from the current index while one refresh runs
+    current = index.suggest('garl')
+    assert current and index.suggest('garl', limit=1) == current[:1]
+    assert index.stats()['building'] == 1
+    assert index.refresh_in_background(flask_app) is None
+
+    release.set()
+    with index._build_lock:
+        assert not index.is_stale()
+    assert builds == ['suggest-index-build']
+
+def test_writes_during_a_build_are_replayed(test_app):
+    for built in (False, True):
+        index = SuggestIndex()
+        if built:
+            index.build()
+        read = index._read
+
+        def read_then_write():
+            snapshot = read()
+            # Committed after the snapshot, applied before the new index is swapped in
+            index.recipe_added('Late Lasagne', ['pasta'])
+            return snapshot
+
+        index._read = read_then_write
+        index.build()
+        assert [item['text'] for item in index.suggest('late')] == ['Late Lasagne']
+        assert index.suggest('pasta') == [{'text': 'pasta', 'type': 'ingredient', 'count': 1}]
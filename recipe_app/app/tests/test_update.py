@@ -0,0 +1,130 @@
+from collections import namedtuple
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.auth.models import User
+from app.recipe.ingredients import diff_ingredients
+from app.recipe.models import Recipe, Ingredient
+
+Row = namedtuple('Row', 'id name quantity')
+
+@pytest.fixture(scope='module')
+def test_client():
+    flask_app = create_app()
+    flask_app.config['TESTING'] = True
+
+    testing_client = flask_app.test_client()
+
+    with flask_app.app_context():
+        db.create_all()
+        user = User(username='updateuser', password='updatepassword')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity={'username': 'updateuser'})
+
+        yield testing_client, token
+
+        db.session.remove()
+        db.drop_all()
+
+RECIPE = {
+    "title": "Guacamole",
+    "description": "Chunky.",
+    "ingredients": [
+        {"name": "avocado", "quantity": "3"},
+        {"name": "lime", "quantity": "1"},
+        {"name": "salt", "quantity": "1 pinch"}
+    ],
+    "instructions": "Mash and season."
+}
+
+def stored_ingredients():
+    recipe = Recipe.query.filter_by(title='Guacamole').one()
+    return {ing.name: (ing.id, ing.quantity) for ing in Ingredient.query.filter_by(recipe_id=recipe.id)}
+
+def test_diff_ingredients():
+    stored = [Row(1, 'avocado', '3'), Row(2, 'lime', '1'), Row(3, 'salt', '1 pinch'), Row(4, 'onion', '1')]
+    desired = [
+        {'name': 'avocado', 'quantity': '3'},
+        {'name': 'lime', 'quantity': '2'},
+        {'name': 'coriander', 'quantity': '1 bunch'},
+        {'name': 'chili', 'quantity': '1'}
+    ]
+    inserts, updates, deletes = diff_ingredients(stored, desired)
+    assert updates == [
+        {'id': 2, 'name': 'lime', 'quantity': '2'},
+        {'id': 3, 'name': 'coriander', 'quantity': '1 bunch'},
+        {'id': 4, 'name': 'chili', 'quantity': '1'}
+    ]
+    assert inserts == []
+    assert deletes == []
+
+    assert diff_ingredients(stored, stored_as_dicts(stored)) == ([], [], [])
+    assert diff_ingredients(stored, []) == ([], [], [1, 2, 3, 4])
+
+    reordered = stored_as_dicts([stored[1], stored[0]] + stored[2:])
+    assert diff_ingredients(stored, reordered) == ([], [
+        {'id': 1, 'name': 'lime', 'quantity': '1'},
+        {'id': 2, 'name': 'avocado', 'quantity': '3'}
+    ], [])
+
+def stored_as_dicts(rows):
+    return [{'name': row.name, 'quantity': row.quantity} for row in rows]
+
+def test_put_only_touches_changed_ingredients(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/recipes', headers=headers, json=RECIPE)
+    before = stored_ingredients()
+    etag = client.get('/recipes/Guacamole').headers['ETag']
+
+    response = client.put('/recipes/Guacamole', headers=headers, json=RECIPE)
+    assert response.status_code == 200
+    assert client.get('/recipes/Guacamole', headers={'If-None-Match': etag}).status_code == 304
+
+    ingredients = RECIPE['ingredients'][:2] + [{"name": "salt", "quantity": "2 pinches"}]
+    client.put('/recipes/Guacamole', headers=headers, json={**RECIPE, "ingredients": ingredients})
+    after = stored_ingredients()
+    assert after['avocado'] == before['avocado']
+    assert after['salt'] == (before['salt'][0], '2 pinches')
+
+def test_patch_fields_and_single_ingredients(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.patch('/recipes/Guacamole', headers=headers, json={"description": "Smooth."})
+    assert response.status_code == 200
+    body = client.get('/recipes/Guacamole').get_json()
+    assert body['description'] == 'Smooth.'
+    assert body['instructions'] == 'Mash and season.'
+    assert len(body['ingredients']) == 3
+
+    response = client.patch('/recipes/Guacamole', headers=headers, json={
+        "ingredient_changes": {"set": [{"name": "lime", "quantity": "2"}, {"name": "tomato", "quantity": "1"}], "remove": ["salt"]}
+    })
+    assert response.status_code == 200
+    assert {name: quantity for name, (_, quantity) in stored_ingredients().items()} == {'avocado': '3', 'lime': '2', 'tomato': '1'}
+
+    response = client.get('/recipes', query_string={'search': 'tomato'})
+    assert [recipe['title'] for recipe in response.get_json()['recipes']] == ['Guacamole']
+
+def test_patch_rejects_unknown_fields(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.patch('/recipes/Guacamole', headers=headers, json={"colour": "green"}).status_code == 400
+    assert client.patch('/recipes/Guacamole', headers=headers, json={}).status_code == 400
+    for changes in ({"remove": 5}, {"remove": "salt"}, {"remove": [{"name": "salt"}]}, {"set": {"name": "salt"}}, {"set": ["salt"]}):
+        assert client.patch('/recipes/Guacamole', headers=headers, json={"ingredient_changes": changes}).status_code == 400
+
+def test_put_that_reorders_ingredients(test_client):
+    client, token = test_client
+    headers = {'Authorization': f'Bearer {token}'}
+    salsa = {**RECIPE, "title": "Salsa"}
+    client.post('/recipes', headers=headers, json=salsa)
+    etag = client.get('/recipes/Salsa').headers['ETag']
+
+    reordered = [salsa['ingredients'][2], salsa['ingredients'][0], salsa['ingredients'][1]]
+    assert client.put('/recipes/Salsa', headers=headers, json={**salsa, "ingredients": reordered}).status_code == 200
+    response = client.get('/recipes/Salsa')
+    assert response.headers['ETag'] != etag
+    assert [{'name': ing['name'], 'quantity': ing['quantity']} for ing in response.get_json()['ingredients']] == reordered
@@ -0,0 +1,132 @@
+"""Login throughput and recipe read latency under a mixed login/read load.
+
+    python benchmarks/bench_login.py --login-threads 16 --read-threads 4 --duration 10
+
+Runs the same load twice against a temporary SQLite database: once with bcrypt
+bounded to --workers pool threads, and once with one pool thread per login
+thread, which behaves like hashing inline on every request thread. Prints a
+JSON report with login throughput and read p50/p99 latency for both.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def setup(app, rounds):
+    import bcrypt
+    from app import db
+    from app.auth.models import User
+    from app.recipe.model_repos.recipe_repo import RecipeRepository
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='bench', password=bcrypt.hashpw(b'bench-password', bcrypt.gensalt(rounds)).decode('utf-8'))
+        db.session.add(user)
+        db.session.commit()
+        for number in range(50):
+            RecipeRepository.create_recipe({
+                'title': f'Benchmark Recipe {number}',
+                'description': 'Seeded for the login benchmark.',
+                'ingredients': [{'name': f'ingredient {i}', 'quantity': '1'} for i in range(8)],
+                'instructions': 'Nothing to see here.'
+            }, user.id)
+
+
+def run_mode(app, workers, args):
+    from app.auth.passwords import password_hasher
+
+    app.config['BCRYPT_WORKERS'] = workers
+    app.config['BCRYPT_MAX_PENDING'] = args.login_threads
+    password_hasher.init_app(app)
+
+    deadline = time.perf_counter() + args.duration
+    logins = []
+    read_latencies = []
+    lock = threading.Lock()
+
+    def login_loop():
+        client = app.test_client()
+        count = 0
+        while time.perf_counter() < deadline:
+            response = client.post('/login', json={'username': 'bench', 'password': 'bench-password'})
+            count += response.status_code == 200
+        with lock:
+            logins.append(count)
+
+    def read_loop():
+        client = app.test_client()
+        latencies = []
+        page = 0
+        while time.perf_counter() < deadline:
+            page = page % 5 + 1
+            started = time.perf_counter()
+            client.get('/recipes', query_string={'page': page})
+            latencies.append((time.perf_counter() - started) * 1000)
+        with lock:
+            read_latencies.extend(latencies)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(args.login_threads)]
+    threads += [threading.Thread(target=read_loop) for _ in range(args.read_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'bcrypt_workers': workers,
+        'logins_per_second': round(sum(logins) / args.duration, 1),
+        'reads': len(read_latencies),
+        'read_p50_ms': round(percentile(read_latencies, 50), 2),
+        'read_p99_ms': round(percentile(read_latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--read-threads', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2, help='bcrypt pool size for the bounded run')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per run')
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['DATABASE_URL'] = f'sqlite:///{database.name}'
+    os.environ['BCRYPT_ROUNDS'] = str(args.rounds)
+    os.environ['RECIPE_CACHE_ENABLED'] = 'false'
+
+    from app import create_app
+    app = create_app()
+    setup(app, args.rounds)
+
+    try:
+        report = {
+            'login_threads': args.login_threads,
+            'read_threads': args.read_threads,
+            'rounds': args.rounds,
+            'duration_seconds': args.duration,
+            'inline': run_mode(app, args.login_threads, args),
+            'bounded': run_mode(app, args.workers, args),
+        }
+    finally:
+        os.unlink(database.name)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
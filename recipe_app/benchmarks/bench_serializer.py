@@ -0,0 +1,94 @@
+"""Recipe list serialization: the previous dict + jsonify path against the
+compiled serializer.
+
+    python benchmarks/bench_serializer.py --recipes 100 --ingredients 10 --repeat 200
+
+Serializes the same in-memory page of recipes (no database access) with each
+variant and prints a JSON report with the mean time per page and the body size.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_recipes(count, ingredients):
+    from app.recipe.models import Recipe, Ingredient
+
+    return [
+        Recipe(
+            id=number,
+            title=f'Benchmark Recipe {number}',
+            description='A reasonably sized description of the dish. ' * 3,
+            instructions='Step one, step two, step three. ' * 20,
+            ingredients=[Ingredient(name=f'ingredient {i}', quantity=f'{i} g') for i in range(ingredients)]
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def jsonify_page(recipes):
+    from flask import jsonify
+
+    output = [
+        {
+            'id': recipe.id,
+            'title': recipe.title,
+            'description': recipe.description,
+            'ingredients': [{'name': ing.name, 'quantity': ing.quantity} for ing in recipe.ingredients],
+            'instructions': recipe.instructions
+        }
+        for recipe in recipes
+    ]
+    return jsonify({'meta': {'page': 1}, 'recipes': output}).get_data()
+
+
+def serializer_page(recipes, fields):
+    from app.recipe.serializers import json_response, serializer_for
+
+    return json_response({'meta': {'page': 1}, 'recipes': serializer_for(fields).many(recipes)}).get_data()
+
+
+def measure(page, repeat):
+    body = page()
+    seconds = min(timeit.repeat(page, number=repeat, repeat=3)) / repeat
+    return {'ms_per_page': round(seconds * 1000, 3), 'bytes': len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipes', type=int, default=100, help='recipes per page')
+    parser.add_argument('--ingredients', type=int, default=10, help='ingredients per recipe')
+    parser.add_argument('--repeat', type=int, default=200, help='pages serialized per timing')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+    from app import create_app
+    from app.recipe import serializers
+
+    app = create_app()
+    with app.app_context():
+        recipes = make_recipes(args.recipes, args.ingredients)
+        fast = serializers.orjson
+        report = {
+            'recipes': args.recipes,
+            'ingredients': args.ingredients,
+            'jsonify': measure(lambda: jsonify_page(recipes), args.repeat),
+            'serializer': measure(lambda: serializer_page(recipes, serializers.RECIPE_FIELDS), args.repeat),
+            'serializer_id_title': measure(lambda: serializer_page(recipes, ('id', 'title')), args.repeat),
+        }
+        serializers.orjson = None
+        try:
+            report['serializer_stdlib'] = measure(lambda: serializer_page(recipes, serializers.RECIPE_FIELDS), args.repeat)
+        finally:
+            serializers.orjson = fast
+        report['encoder'] = 'orjson' if fast is not None else 'json'
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Application startup time and gunicorn prefork boot time.
+
+    python benchmarks/bench_startup.py --runs 10 --workers 8
+
+Measures `import app` and `create_app()` in fresh interpreters with
+DATABASE_URL pointing at a database that cannot be opened, which also checks
+that the factory stays DB-free. With --workers (and gunicorn installed) it then
+starts gunicorn.conf.py with and without preload_app and reports the time until
+every worker has booted and answered a request, plus the workers' private
+(unshared) memory on Linux. Prints a JSON report.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNREACHABLE_DATABASE = 'sqlite:////nonexistent-directory/recipes.db'
+
+MEASURE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': created - imported}))
+"""
+
+
+def measure_factory(runs):
+    env = dict(os.environ, DATABASE_URL=UNREACHABLE_DATABASE)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', MEASURE], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+        sample = json.loads(output)
+        sample['process'] = time.perf_counter() - started
+        samples.append(sample)
+    return {
+        f'{key}_ms': {
+            'median': round(statistics.median(sample[key] for sample in samples) * 1000, 1),
+            'min': round(min(sample[key] for sample in samples) * 1000, 1),
+        }
+        for key in ('import', 'create_app', 'process')
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def private_memory_kb(pid):
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return None
+    return sum(int(fields.get(name, '0 kB').split()[0]) for name in ('Private_Clean', 'Private_Dirty'))
+
+
+def boot_gunicorn(workers, preload, timeout=60):
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=UNREACHABLE_DATABASE,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_PRELOAD='true' if preload else 'false',
+    )
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True
+    )
+    pids = []
+    booted = threading.Event()
+
+    def read_log():
+        for line in process.stderr:
+            match = re.search(r'Booting worker with pid: (\d+)', line)
+            if match:
+                pids.append(int(match.group(1)))
+                if len(pids) == workers:
+                    booted.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    try:
+        if not booted.wait(timeout):
+            raise RuntimeError('gunicorn workers did not boot in time')
+        spawned = time.perf_counter() - started
+
+        # Workers import the app lazily without preload; wait until each can
+        # serve (one request per worker is not guaranteed, so poll a few times).
+        deadline = time.perf_counter() + timeout
+        answered = 0
+        while answered < workers * 2 and time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+                    answered += response.status == 200
+            except OSError:
+                time.sleep(0.01)
+        serving = time.perf_counter() - started
+
+        memory = [private_memory_kb(pid) for pid in pids]
+        memory = [kb for kb in memory if kb is not None]
+        return {
+            'workers': workers,
+            'preload_app': preload,
+            'workers_spawned_ms': round(spawned * 1000, 1),
+            'serving_ms': round(serving * 1000, 1),
+            'worker_private_memory_kb': round(statistics.mean(memory)) if memory else None,
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters for the factory timing')
+    parser.add_argument('--workers', type=int, default=0, help='gunicorn workers to boot (0 skips gunicorn)')
+    args = parser.parse_args()
+
+    report = {'factory': measure_factory(args.runs)}
+    if args.workers:
+        if shutil.which('gunicorn') is None:
+            report['gunicorn'] = 'gunicorn is not installed'
+        else:
+            report['gunicorn'] = [boot_gunicorn(args.workers, preload) for preload in (True, False)]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Typeahead lookup latency of the in-memory suggest index.
+
+    python benchmarks/bench_suggest.py --titles 50000 --ingredients 2000
+
+Fills the index with synthetic titles and ingredient names (no database) and
+times uncached lookups for one- to four-letter prefixes, printing a JSON
+report with p50/p99 latency per prefix length, build time and memory use.
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def word(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, default=50000)
+    parser.add_argument('--ingredients', type=int, default=2000)
+    parser.add_argument('--lookups', type=int, default=2000, help='lookups per prefix length')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    from app.recipe.suggest import SuggestIndex
+
+    rng = random.Random(args.seed)
+    ingredients = [word(rng) for _ in range(args.ingredients)]
+    index = SuggestIndex()
+    index.built_at = time.monotonic()
+
+    started = time.perf_counter()
+    index.apply(added=[
+        (' '.join(word(rng) for _ in range(rng.randint(1, 4))).title(), rng.sample(ingredients, 8))
+        for _ in range(args.titles)
+    ])
+    build_seconds = time.perf_counter() - started
+
+    report = {
+        'titles': args.titles,
+        'ingredients': args.ingredients,
+        'keys': len(index.keys),
+        'memory_bytes': index.memory_bytes(),
+        'incremental_build_seconds': round(build_seconds, 3),
+    }
+    for length in range(1, 5):
+        latencies = []
+        for _ in range(args.lookups):
+            prefix = ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+            index.results = {}  # time uncached lookups
+            started = time.perf_counter()
+            index.suggest(prefix, 10)
+            latencies.append((time.perf_counter() - started) * 1000)
+        report[f'prefix_{length}'] = {
+            'p50_ms': round(percentile(latencies, 50), 4),
+            'p99_ms': round(percentile(latencies, 99), 4),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Seeded synthetic catalog generator for the benchmark suite.
+
+    python benchmarks/catalog.py --database-url sqlite:////tmp/bench.db --users 20 --recipes 20000 --seed 42
+
+Drops and recreates the schema, then creates --users users (all with the
+password BENCH_PASSWORD) and --recipes recipes spread across them, loaded
+through the bulk importer so the search index and ingredient catalog are
+filled exactly as in production. The same seed and sizes always produce the
+same catalog. Prints a JSON summary.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_PASSWORD = 'bench-password'
+
+ADJECTIVES = [
+    'spicy', 'smoky', 'creamy', 'crispy', 'roasted', 'braised', 'grilled', 'sticky', 'zesty', 'golden',
+    'rustic', 'quick', 'slow-cooked', 'herby', 'garlicky', 'sweet', 'tangy', 'charred', 'classic', 'simple',
+]
+DISHES = [
+    'soup', 'stew', 'curry', 'salad', 'pie', 'tart', 'risotto', 'pasta', 'noodles', 'stir fry',
+    'bread', 'cake', 'tacos', 'pilaf', 'gratin', 'casserole', 'skewers', 'dumplings', 'pancakes', 'bake',
+]
+BASE_INGREDIENTS = [
+    'garlic', 'onion', 'olive oil', 'salt', 'black pepper', 'butter', 'flour', 'sugar', 'egg', 'milk',
+    'tomato', 'ginger', 'chicken thigh', 'beef mince', 'rice', 'potato', 'carrot', 'celery', 'lemon', 'lime',
+    'chili', 'cumin', 'coriander', 'paprika', 'soy sauce', 'honey', 'cream', 'parmesan', 'basil', 'thyme',
+    'rosemary', 'spinach', 'mushroom', 'chickpeas', 'lentils', 'coconut milk', 'peanut', 'tofu', 'miso', 'stock',
+]
+QUANTITIES = ['1', '2', '3', '1 tbsp', '2 tbsp', '1 tsp', '100 g', '200 g', '500 g', '1 cup', 'a pinch', None]
+
+
+def ingredient_vocabulary(size, rng):
+    # The base names plus seeded variants, so catalogs can have many distinct
+    # ingredients while the common ones stay common.
+    names = list(BASE_INGREDIENTS)
+    while len(names) < size:
+        names.append(f'{rng.choice(ADJECTIVES)} {rng.choice(BASE_INGREDIENTS)} {len(names)}')
+    return names[:size]
+
+
+def generate_recipes(count, rng, vocabulary, min_ingredients, max_ingredients, description_words, instruction_words):
+    # Ingredient popularity follows a Zipf-like curve (weight 1/rank).
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    words = BASE_INGREDIENTS + ADJECTIVES + DISHES
+    for number in range(1, count + 1):
+        names = set()
+        target = rng.randint(min_ingredients, max_ingredients)
+        while len(names) < min(target, len(vocabulary)):
+            names.add(rng.choices(vocabulary, weights)[0])
+        yield {
+            'title': f'{rng.choice(ADJECTIVES).title()} {rng.choice(BASE_INGREDIENTS).title()} {rng.choice(DISHES).title()} {number}',
+            'description': ' '.join(rng.choice(words) for _ in range(description_words)),
+            'ingredients': [{'name': name, 'quantity': rng.choice(QUANTITIES)} for name in sorted(names)],
+            'instructions': ' '.join(rng.choice(words) for _ in range(instruction_words)),
+        }
+
+
+def seed_catalog(app, users=10, recipes=1000, ingredients=200, min_ingredients=3, max_ingredients=12,
+                 description_words=20, instruction_words=120, seed=42, batch_size=1000):
+    import bcrypt
+    from app import db
+    from app.auth.models import User
+    from app.recipe.importer import RecipeImporter
+
+    rng = random.Random(seed)
+    vocabulary = ingredient_vocabulary(ingredients, rng)
+    started = time.perf_counter()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        password = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), bcrypt.gensalt(app.config['BCRYPT_ROUNDS'])).decode('utf-8')
+        accounts = [User(username=f'bench{number}', password=password) for number in range(users)]
+        db.session.add_all(accounts)
+        db.session.commit()
+
+        rows = generate_recipes(recipes, rng, vocabulary, min_ingredients, max_ingredients, description_words, instruction_words)
+        imported = 0
+        for index, account in enumerate(accounts):
+            share = recipes // users + (1 if index < recipes % users else 0)
+            batch = ((row_number, next(rows)) for row_number in range(1, share + 1))
+            imported += RecipeImporter(account.id, batch_size).run(batch)['imported']
+
+    return {
+        'users': users,
+        'recipes': imported,
+        'ingredients': len(vocabulary),
+        'ingredients_per_recipe': [min_ingredients, max_ingredients],
+        'seed': seed,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def add_catalog_arguments(parser):
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--ingredients', type=int, default=200, help='distinct ingredient names')
+    parser.add_argument('--min-ingredients', type=int, default=3, help='ingredients per recipe, lower bound')
+    parser.add_argument('--max-ingredients', type=int, default=12, help='ingredients per recipe, upper bound')
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def catalog_options(args):
+    return {
+        'users': args.users,
+        'recipes': args.recipes,
+        'ingredients': args.ingredients,
+        'min_ingredients': args.min_ingredients,
+        'max_ingredients': args.max_ingredients,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL', 'sqlite:////tmp/recipe-bench.db'))
+    add_catalog_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('BCRYPT_ROUNDS', '4')
+
+    from app import create_app
+    print(json.dumps(seed_catalog(create_app(), **catalog_options(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Compare two load driver reports and flag regressions.
+
+    python benchmarks/compare.py results/baseline.json results/candidate.json --threshold 10
+
+Prints throughput and p50/p95/p99 latency for every scenario present in both
+reports with the relative change, and exits with status 1 when any scenario
+lost more than --threshold percent throughput, gained more than --threshold
+percent p95/p99 latency, or started returning errors.
+"""
+import argparse
+import json
+import sys
+
+
+def change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(baseline, candidate, threshold):
+    rows = []
+    regressions = []
+    for name, before in baseline['scenarios'].items():
+        after = candidate['scenarios'].get(name)
+        if after is None:
+            continue
+        metrics = [('throughput_rps', before['throughput_rps'], after['throughput_rps'], -1)]
+        metrics += [
+            (f'{pct}_ms', before['latency_ms'][pct], after['latency_ms'][pct], 1)
+            for pct in ('p50', 'p95', 'p99')
+        ]
+        for metric, old, new, direction in metrics:
+            delta = change(old, new)
+            rows.append((name, metric, old, new, delta))
+            # p50 is reported but too noisy to gate on
+            if delta is not None and metric != 'p50_ms' and delta * direction > threshold:
+                regressions.append(f'{name} {metric}: {old} -> {new} ({delta:+.1f}%)')
+        if after['errors'] > before['errors']:
+            regressions.append(f'{name} errors: {before["errors"]} -> {after["errors"]}')
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10, help='allowed change in percent')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    for key in ('target', 'database', 'concurrency', 'cache'):
+        if baseline['meta'].get(key) != candidate['meta'].get(key):
+            print(f'warning: runs differ in {key}: {baseline["meta"].get(key)} vs {candidate["meta"].get(key)}', file=sys.stderr)
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    print(f'{"scenario":<14}{"metric":<16}{"baseline":>12}{"candidate":>12}{"change":>10}')
+    for name, metric, old, new, delta in rows:
+        shown = f'{delta:+.1f}%' if delta is not None else '-'
+        print(f'{name:<14}{metric:<16}{old if old is not None else "-":>12}{new if new is not None else "-":>12}{shown:>10}')
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold}%:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
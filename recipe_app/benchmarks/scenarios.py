@@ -0,0 +1,184 @@
+"""Request scenarios for the load driver (benchmarks/load.py).
+
+Each scenario is a function taking a Worker and issuing exactly one timed
+request through worker.timed(); any setup it needs (e.g. creating a recipe to
+update) is done untimed.
+"""
+import http.client
+import json
+import time
+from urllib.parse import quote, urlencode, urlsplit
+
+SEARCH_TERMS = ['garlic', 'soup', 'spicy chicken', 'lemon', 'roasted potato', 'curry', 'ginger soy', 'pasta']
+
+
+class InProcessClient:
+    # Drives the WSGI app directly; measures the application, not the network.
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, params=None, body=None, headers=None):
+        response = self.client.open(path, method=method, query_string=params, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    # One keep-alive connection per worker against a running server.
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = None
+
+    def request(self, method, path, params=None, body=None, headers=None):
+        url = self.prefix + path + ('?' + urlencode(params) if params else '')
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connection_class(self.host, timeout=30)
+            try:
+                self.connection.request(method, url, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+class Worker:
+
+    def __init__(self, number, client, token, catalog, rng):
+        self.number = number
+        self.client = client
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.catalog = catalog
+        self.rng = rng
+        self.created = []
+        self.counter = 0
+        self.latencies = []
+        self.errors = 0
+
+    def timed(self, method, path, params=None, body=None, auth=False, expected=(200,)):
+        started = time.perf_counter()
+        try:
+            status, _ = self.client.request(method, path, params, body, self.headers if auth else None)
+        except Exception:
+            status = None
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        if status not in expected:
+            self.errors += 1
+        return status
+
+    def new_recipe(self):
+        self.counter += 1
+        return {
+            'title': f'Load Test {self.number}-{self.counter}',
+            'description': 'Created by the load driver.',
+            'ingredients': [{'name': name, 'quantity': '1'} for name in self.rng.sample(self.catalog['ingredients'], 5)],
+            'instructions': 'Mix and cook.',
+        }
+
+    def own_title(self):
+        # Untimed setup for update/delete: make sure this worker owns a recipe
+        if not self.created:
+            recipe = self.new_recipe()
+            status, _ = self.client.request('POST', '/recipes', body=recipe, headers=self.headers)
+            if status == 201:
+                self.created.append(recipe['title'])
+        return self.created[-1] if self.created else 'missing'
+
+
+def list_recipes(worker):
+    worker.timed('GET', '/recipes', {'page': worker.rng.randint(1, 5)})
+
+
+def deep_offset(worker):
+    pages = worker.catalog['pages']
+    worker.timed('GET', '/recipes', {'page': worker.rng.randint(max(1, int(pages * 0.8)), pages)})
+
+
+def deep_cursor(worker):
+    from app.recipe.pagination import encode_cursor
+
+    max_id = worker.catalog['max_id']
+    cursor = encode_cursor({'id': worker.rng.randint(int(max_id * 0.8), max(max_id - 10, 1))})
+    worker.timed('GET', '/recipes', {'cursor': cursor})
+
+
+def search(worker):
+    worker.timed('GET', '/recipes', {'search': worker.rng.choice(SEARCH_TERMS)})
+
+
+def get_by_title(worker):
+    worker.timed('GET', '/recipes/' + quote(worker.rng.choice(worker.catalog['titles']), safe=''))
+
+
+def stats(worker):
+    worker.timed('GET', '/recipes/stats')
+
+
+def create(worker):
+    recipe = worker.new_recipe()
+    if worker.timed('POST', '/recipes', body=recipe, auth=True, expected=(201,)) == 201:
+        worker.created.append(recipe['title'])
+
+
+def update(worker):
+    title = worker.own_title()
+    recipe = worker.new_recipe()
+    recipe['title'] = title
+    worker.timed('PUT', '/recipes/' + quote(title, safe=''), body=recipe, auth=True)
+
+
+def delete(worker):
+    title = worker.own_title()
+    if worker.timed('DELETE', '/recipes/' + quote(title, safe=''), auth=True) == 200:
+        worker.created.remove(title)
+
+
+SCENARIOS = {
+    'list': list_recipes,
+    'deep_offset': deep_offset,
+    'deep_cursor': deep_cursor,
+    'search': search,
+    'get': get_by_title,
+    'stats': stats,
+    'create': create,
+    'update': update,
+    'delete': delete,
+}
+
+DEFAULT_MIX = 'list=40,get=25,search=15,deep_cursor=5,create=6,update=6,delete=3'
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario in mix: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def mixed(mix):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    def run(worker):
+        SCENARIOS[worker.rng.choices(names, weights)[0]](worker)
+    return run
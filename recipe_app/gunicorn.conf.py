@@ -0,0 +1,42 @@
+# gunicorn -c gunicorn.conf.py
+#
+# The app is imported once in the master (preload_app) and forked, so workers
+# share its code pages and boot without importing anything. The app factory
+# never connects to the database; run `flask init-db` before the first start.
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'run:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's generations, so
+    # collections in the workers do not touch (and copy) the shared pages.
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # Pooled connections must never be shared between processes. The factory
+    # opens none, but drop anything the master may have opened anyway.
+    if server.cfg.preload_app:
+        from run import app
+        from app import db
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Build the suggest index while the worker starts taking requests rather
+    # than on the first /recipes/suggest request.
+    from app.recipe.suggest import suggest_index
+
+    suggest_index.refresh_in_background(worker.wsgi)